@@ -1,3 +1,12 @@
+# eventlet must monkey-patch the stdlib before anything else imports it, so
+# Socket.IO clients are served by greenlets instead of one OS thread each
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    _ASYNC_MODE = 'eventlet'
+except ImportError:
+    _ASYNC_MODE = 'threading'
+
 import os
 import sys
 import argparse
@@ -6,6 +15,24 @@ from flask import Flask, jsonify, request, send_from_directory
 from flask_socketio import SocketIO, emit
 from server.streaming_server import StreamingServer, StreamingServerConfig
 
+# orjson encodes the broadcast metrics dicts several times faster than the
+# stdlib; fall back to stdlib json when it is not installed
+try:
+    import orjson
+
+    class _OrjsonHandler:
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(data, **kwargs):
+            return orjson.loads(data)
+
+    _socketio_json = _OrjsonHandler
+except ImportError:
+    import json as _socketio_json
+
 # ----- CLI ARGUMENT PARSING -----
 
 def parse_args():
@@ -69,8 +96,15 @@ class App:
         self.port = port
         self.streaming_server = StreamingServer(config)
         self.app = self.streaming_server.app  # Flask app
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", json=_socketio_json,
+                                 async_mode=_ASYNC_MODE)
         self.is_running = False
+        self._emitter_started = False
+        # Bumped on every start so a stop/start cycle can't leave a stale
+        # loop running alongside the new one
+        self._emitter_generation = 0
+        self._last_metrics = None
+        self._client_count = 0
 
         # Static/public serving (match Express static)
         @self.app.route('/public/<path:filename>')
@@ -109,36 +143,51 @@ class App:
         @self.socketio.on('connect')
         def handle_connect():
             print("Client connected")
+            self._client_count += 1
             emit('server-status', True)
-            try:
-                metrics = self.get_system_metrics()
-                emit('metrics-update', metrics)
-            except Exception as e:
-                print('Error getting initial metrics:', e)
+            # No synchronous collection: serve the last broadcast sample
+            if self._last_metrics is not None:
+                emit('metrics-update', self._last_metrics)
 
         @self.socketio.on('disconnect')
         def handle_disconnect():
             print("Client disconnected")
+            self._client_count = max(0, self._client_count - 1)
 
         @self.socketio.on('request-metrics')
         def handle_request_metrics():
-            try:
-                metrics = self.get_system_metrics()
-                emit('metrics-update', metrics)
-            except Exception as e:
-                print('Error sending metrics:', e)
+            if self._last_metrics is not None:
+                emit('metrics-update', self._last_metrics)
 
         @self.socketio.on('request-server-status')
         def handle_request_status():
             emit('server-status', True)
 
     def start_metrics_emission(self):
-        metrics = self.get_system_metrics()
-        self.socketio.emit('metrics-update', metrics)
-        # For real periodic: use a background thread/timer if desired
+        if self._emitter_started:
+            return
+        self._emitter_started = True
+        self._emitter_generation += 1
+        self.socketio.start_background_task(self._emit_metrics_loop,
+                                            self._emitter_generation)
 
     def stop_metrics_emission(self):
-        pass  # No periodic emission unless you add it
+        self._emitter_started = False
+
+    def _emit_metrics_loop(self, generation):
+        # Single broadcaster: one collection cycle per interval regardless of
+        # how many clients are connected. The payload dict is built once per
+        # cycle and serialized by the orjson handler installed above; with no
+        # subscribers the cycle is skipped entirely. The generation token
+        # retires this loop if the emitter was restarted while it slept.
+        while self._emitter_started and generation == self._emitter_generation:
+            try:
+                if self._client_count > 0:
+                    self._last_metrics = self.get_system_metrics()
+                    self.socketio.emit('metrics-update', self._last_metrics)
+            except Exception as e:
+                print('Error emitting metrics:', e)
+            self.socketio.sleep(1.0)
 
     def start_status_emission(self):
         self.socketio.emit('server-status', True)
@@ -180,8 +229,16 @@ class App:
         self.socketio.run(self.app, host='0.0.0.0', port=self.port)
 
     def stop(self):
-        # Graceful shutdown handled below
-        pass
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.stop_metrics_emission()
+        self.streaming_server.stop()
+        try:
+            self.socketio.stop()
+        except Exception:
+            pass  # Not running inside a socketio context (e.g. signal handler)
+        print('🛑 Server shut down gracefully')
 
 def time_now_iso():
     import datetime
@@ -205,5 +262,7 @@ if __name__ == '__main__':
 
     signal.signal(signal.SIGINT, handle_shutdown)
     signal.signal(signal.SIGTERM, handle_shutdown)
+    if hasattr(signal, 'SIGQUIT'):
+        signal.signal(signal.SIGQUIT, handle_shutdown)
 
     app.start()
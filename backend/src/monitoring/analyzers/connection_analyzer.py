@@ -1,12 +1,32 @@
+import itertools
 import threading
 import time
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, deque
+from itertools import islice
+from operator import attrgetter
 from typing import List, Dict, Optional, Callable, Any
 
+# Millisecond time constants, hoisted so they are not recomputed per event
+MIN_MS = 60_000
+FIVE_MIN_MS = 300_000
+DAY_MS = 86_400_000
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+# Connections are appended in time order, so recent-window boundaries can be
+# located with bisect instead of filtering the whole history
+_conn_ts = attrgetter('timestamp')
+
 # Data structures
 
 class ConnectionData:
-    def __init__(self, ip: str, timestamp: float, type: str, resource=None, userAgent=None, bytesTransferred=0, duration=None):
+    # Allocated per logged connection; __slots__ avoids a per-instance __dict__
+    __slots__ = ('ip', 'timestamp', 'type', 'resource', 'userAgent',
+                 'bytesTransferred', 'duration', 'connectionId')
+
+    def __init__(self, ip: str, timestamp: float, type: str, resource=None, userAgent=None, bytesTransferred=0, duration=None, connectionId=None):
         self.ip = ip
         self.timestamp = timestamp
         self.type = type
@@ -14,8 +34,11 @@ class ConnectionData:
         self.userAgent = userAgent
         self.bytesTransferred = bytesTransferred
         self.duration = duration
+        self.connectionId = connectionId
 
 class SuspiciousActivity:
+    __slots__ = ('ip', 'type', 'timestamp', 'details', 'severity')
+
     def __init__(self, ip: str, type: str, timestamp: float, details: str, severity: str):
         self.ip = ip
         self.type = type
@@ -31,115 +54,151 @@ class ConnectionMetrics:
         self.averageConnectionDuration = 0
         self.totalBytesTransferred = 0
         self.uniqueIPs = 0
-        self.suspiciousActivity: List[SuspiciousActivity] = []
+        self.suspiciousActivity = deque(maxlen=100)
+        self.suspiciousBySeverity = {'low': 0, 'medium': 0, 'high': 0}
 
 class ConnectionAnalyzer:
     def __init__(self):
-        self.connections: Dict[str, List[ConnectionData]] = defaultdict(list)
+        self.maxConnectionHistory = 1000
+        self.connections: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.maxConnectionHistory))
+        self.connectionsById: Dict[str, ConnectionData] = {}
+        self._idCounter = itertools.count()
         self.activeConnections: set = set()
         self.metrics = ConnectionMetrics()
-        self.maxConnectionHistory = 1000
         self.suspiciousThresholds = {
             'rapidRequests': 10,
             'largeDownload': 100 * 1024 * 1024,
             'connectionDuration': 300000  # 5 minutes in ms
         }
         self.suspicious_callbacks: List[Callable[[SuspiciousActivity], Any]] = []
-        self.analysisInterval: Optional[threading.Timer] = None
+        self._durationSum = 0.0
+        self._durationCount = 0
+        self._stopAnalysis = threading.Event()
+        self._analysisThread: Optional[threading.Thread] = None
         self._start_analysis()
 
     def initialize_metrics(self):
         return ConnectionMetrics()
 
     def log_connection(self, ip: str, type: str, resource=None, userAgent=None) -> str:
-        connectionId = self._generate_connection_id()
+        timestamp = _now_ms()
+        connectionId = self._generate_connection_id(ip, timestamp, type)
         connectionData = ConnectionData(
             ip=ip,
-            timestamp=time.time() * 1000,
+            timestamp=timestamp,
             type=type,
             resource=resource,
-            userAgent=userAgent
+            userAgent=userAgent,
+            connectionId=connectionId
         )
-        self.connections[ip].append(connectionData)
-        if len(self.connections[ip]) > self.maxConnectionHistory:
-            self.connections[ip].pop(0)
+        ipConnections = self.connections[ip]
+        if len(ipConnections) == self.maxConnectionHistory:
+            # Bounded deque: the append below evicts the oldest entry
+            evicted = ipConnections[0]
+            self.connectionsById.pop(evicted.connectionId, None)
+            self._subtract_from_aggregates(evicted)
+        ipConnections.append(connectionData)
+        self.connectionsById[connectionId] = connectionData
+        self.metrics.totalConnections += 1
+        self.metrics.connectionsByType[type] = self.metrics.connectionsByType.get(type, 0) + 1
+        self.metrics.uniqueIPs = len(self.connections)
         self.activeConnections.add(connectionId)
-        self._update_metrics()
+        self.metrics.activeConnections = len(self.activeConnections)
         self._check_suspicious_activity(ip, connectionData)
         return connectionId
 
     def update_connection_bytes(self, connectionId: str, bytes_: int):
-        for ip, connections in self.connections.items():
-            for connection in connections:
-                if self._generate_connection_id_from(connection) == connectionId:
-                    connection.bytesTransferred = bytes_
-                    self._update_metrics()
-                    if bytes_ > self.suspiciousThresholds['largeDownload']:
-                        self._flag_suspicious_activity(ip, 'large_download',
-                            f"Large download detected: {self._format_bytes(bytes_)}", 'medium')
-                    return
+        connection = self.connectionsById.get(connectionId)
+        if connection is None:
+            return
+        self.metrics.totalBytesTransferred += bytes_ - (connection.bytesTransferred or 0)
+        connection.bytesTransferred = bytes_
+        if bytes_ > self.suspiciousThresholds['largeDownload']:
+            self._flag_suspicious_activity(connection.ip, 'large_download',
+                f"Large download detected: {self._format_bytes(bytes_)}", 'medium')
 
     def close_connection(self, connectionId: str):
         self.activeConnections.discard(connectionId)
-        for connections in self.connections.values():
-            for connection in connections:
-                if self._generate_connection_id_from(connection) == connectionId:
-                    connection.duration = time.time() * 1000 - connection.timestamp
-                    break
-        self._update_metrics()
+        self.metrics.activeConnections = len(self.activeConnections)
+        connection = self.connectionsById.get(connectionId)
+        if connection is not None and connection.duration is None:
+            connection.duration = _now_ms() - connection.timestamp
+            self._durationSum += connection.duration
+            self._durationCount += 1
 
-    def _generate_connection_id(self):
-        return f"{int(time.time() * 1000)}_{hex(int(time.time() * 1000000) % 0xffffff)[2:]}"
+    def _subtract_from_aggregates(self, connection: ConnectionData):
+        self.metrics.totalConnections -= 1
+        typeCount = self.metrics.connectionsByType.get(connection.type, 0) - 1
+        if typeCount > 0:
+            self.metrics.connectionsByType[connection.type] = typeCount
+        else:
+            self.metrics.connectionsByType.pop(connection.type, None)
+        self.metrics.totalBytesTransferred -= connection.bytesTransferred or 0
+        if connection.duration:
+            self._durationSum -= connection.duration
+            self._durationCount -= 1
 
-    def _generate_connection_id_from(self, connection: ConnectionData):
-        return f"{connection.ip}_{int(connection.timestamp)}_{connection.type}"
+    def _generate_connection_id(self, ip: str, timestamp: float, type: str):
+        return f"{ip}_{int(timestamp)}_{type}_{next(self._idCounter)}"
 
     def _update_metrics(self):
-        allConnections = []
-        uniqueIPs = set()
-        for ip, connections in self.connections.items():
-            uniqueIPs.add(ip)
-            allConnections.extend(connections)
-        self.metrics.totalConnections = len(allConnections)
+        # Bulk recompute; only used after bulk eviction in _cleanup_old_connections.
+        # The per-event paths maintain the aggregates incrementally.
+        # One lazy traversal folds every aggregate; no intermediate list copies.
+        total = 0
+        byType = {}
+        durationSum = 0.0
+        durationCount = 0
+        byteSum = 0
+        for connection in itertools.chain.from_iterable(self.connections.values()):
+            total += 1
+            byType[connection.type] = byType.get(connection.type, 0) + 1
+            if connection.duration:
+                durationSum += connection.duration
+                durationCount += 1
+            byteSum += connection.bytesTransferred or 0
+        self.metrics.totalConnections = total
         self.metrics.activeConnections = len(self.activeConnections)
-        self.metrics.uniqueIPs = len(uniqueIPs)
-        # Connection types
-        self.metrics.connectionsByType = {}
-        for connection in allConnections:
-            self.metrics.connectionsByType[connection.type] = self.metrics.connectionsByType.get(connection.type, 0) + 1
-        # Average duration and total bytes
-        completedConnections = [c for c in allConnections if c.duration]
-        if completedConnections:
-            self.metrics.averageConnectionDuration = sum(c.duration for c in completedConnections) / len(completedConnections)
-        else:
-            self.metrics.averageConnectionDuration = 0
-        self.metrics.totalBytesTransferred = sum(c.bytesTransferred or 0 for c in allConnections)
+        self.metrics.uniqueIPs = len(self.connections)
+        self.metrics.connectionsByType = byType
+        self._durationSum = durationSum
+        self._durationCount = durationCount
+        self.metrics.totalBytesTransferred = byteSum
 
     def _check_suspicious_activity(self, ip: str, newConnection: ConnectionData):
         ipConnections = self.connections.get(ip, [])
-        now = time.time() * 1000
-        recentConnections = [c for c in ipConnections if now - c.timestamp < 60000]
+        now = _now_ms()
+        recentStart = bisect_left(ipConnections, now - MIN_MS, key=_conn_ts)
+        recentCount = len(ipConnections) - recentStart
         # rapid requests
-        if len(recentConnections) >= self.suspiciousThresholds['rapidRequests']:
+        if recentCount >= self.suspiciousThresholds['rapidRequests']:
             self._flag_suspicious_activity(ip, 'rapid_requests',
-                f"{len(recentConnections)} requests in the last minute", 'high')
+                f"{recentCount} requests in the last minute", 'high')
         # repeated file downloads
-        typeCount = sum(1 for c in recentConnections if c.type == newConnection.type)
-        if typeCount > 5 and newConnection.type == 'file_download':
-            self._flag_suspicious_activity(ip, 'unusual_pattern',
-                f"Repeated {newConnection.type} requests", 'medium')
+        if newConnection.type == 'file_download':
+            typeCount = sum(1 for c in islice(ipConnections, recentStart, None)
+                            if c.type == newConnection.type)
+            if typeCount > 5:
+                self._flag_suspicious_activity(ip, 'unusual_pattern',
+                    f"Repeated {newConnection.type} requests", 'medium')
 
     def _flag_suspicious_activity(self, ip: str, type_: str, details: str, severity: str):
         activity = SuspiciousActivity(
             ip=ip,
             type=type_,
-            timestamp=time.time() * 1000,
+            timestamp=_now_ms(),
             details=details,
             severity=severity
         )
-        self.metrics.suspiciousActivity.append(activity)
-        if len(self.metrics.suspiciousActivity) > 100:
-            self.metrics.suspiciousActivity.pop(0)
+        log = self.metrics.suspiciousActivity
+        if len(log) == log.maxlen:
+            # Ring buffer is full: the append below evicts the oldest entry
+            evictedSeverity = log[0].severity
+            self.metrics.suspiciousBySeverity[evictedSeverity] = \
+                self.metrics.suspiciousBySeverity.get(evictedSeverity, 0) - 1
+        log.append(activity)
+        self.metrics.suspiciousBySeverity[severity] = \
+            self.metrics.suspiciousBySeverity.get(severity, 0) + 1
         # Emit event via callback
         for cb in self.suspicious_callbacks:
             cb(activity)
@@ -148,36 +207,49 @@ class ConnectionAnalyzer:
         self.suspicious_callbacks.append(callback)
 
     def _start_analysis(self):
-        def periodic():
+        # One long-lived daemon thread instead of re-spawning a Timer every cycle
+        self._analysisThread = threading.Thread(target=self._analysis_loop, daemon=True)
+        self._analysisThread.start()
+
+    def _analysis_loop(self):
+        while True:
             self._cleanup_old_connections()
             self._perform_security_analysis()
-            self.analysisInterval = threading.Timer(30, periodic)
-            self.analysisInterval.daemon = True
-            self.analysisInterval.start()
-        periodic()
+            if self._stopAnalysis.wait(30):
+                break
 
     def _cleanup_old_connections(self):
-        cutoffTime = time.time() * 1000 - 24 * 60 * 60 * 1000
+        now = _now_ms()
+        cutoffTime = now - DAY_MS
         for ip in list(self.connections.keys()):
-            filtered = [c for c in self.connections[ip] if c.timestamp > cutoffTime]
-            if not filtered:
+            ipConnections = self.connections[ip]
+            # Entries are time-ordered: trim expired ones from the left in
+            # place instead of rebuilding the deque
+            while ipConnections and ipConnections[0].timestamp <= cutoffTime:
+                evicted = ipConnections.popleft()
+                self.connectionsById.pop(evicted.connectionId, None)
+            if not ipConnections:
                 del self.connections[ip]
-            else:
-                self.connections[ip] = filtered
-        self.metrics.suspiciousActivity = [
-            a for a in self.metrics.suspiciousActivity if time.time() * 1000 - a.timestamp < 24 * 60 * 60 * 1000
-        ]
+        self.metrics.suspiciousActivity = deque(
+            (a for a in self.metrics.suspiciousActivity if now - a.timestamp < DAY_MS),
+            maxlen=100
+        )
+        counts = {'low': 0, 'medium': 0, 'high': 0}
+        for a in self.metrics.suspiciousActivity:
+            counts[a.severity] = counts.get(a.severity, 0) + 1
+        self.metrics.suspiciousBySeverity = counts
+        self._update_metrics()
 
     def _perform_security_analysis(self):
-        now = time.time() * 1000
+        now = _now_ms()
         for ip, connections in self.connections.items():
-            recentConnections = [c for c in connections if now - c.timestamp < 300000]
+            recentStart = bisect_left(connections, now - FIVE_MIN_MS, key=_conn_ts)
             # potential DDoS
-            if len(recentConnections) > 20:
+            if len(connections) - recentStart > 20:
                 self._flag_suspicious_activity(ip, 'unusual_pattern',
                     'Potential DDoS pattern detected', 'high')
             # data exfiltration
-            totalBytes = sum(c.bytesTransferred or 0 for c in recentConnections)
+            totalBytes = sum(c.bytesTransferred or 0 for c in islice(connections, recentStart, None))
             if totalBytes > 500 * 1024 * 1024:
                 self._flag_suspicious_activity(ip, 'large_download',
                     'Potential data exfiltration detected', 'high')
@@ -192,6 +264,10 @@ class ConnectionAnalyzer:
         return f"{bytes_} B"
 
     def get_metrics(self):
+        if self._durationCount:
+            self.metrics.averageConnectionDuration = self._durationSum / self._durationCount
+        else:
+            self.metrics.averageConnectionDuration = 0
         return self.metrics
 
     def get_connection_history(self, ip=None):
@@ -203,10 +279,10 @@ class ConnectionAnalyzer:
         return sorted(allConnections, key=lambda c: -c.timestamp)
 
     def destroy(self):
-        if self.analysisInterval:
-            self.analysisInterval.cancel()
-            self.analysisInterval = None
+        self._stopAnalysis.set()
+        self._analysisThread = None
         self.connections.clear()
+        self.connectionsById.clear()
         self.activeConnections.clear()
         self.suspicious_callbacks.clear()
 
@@ -1,7 +1,62 @@
-from typing import List, Dict, Any
+import sys
 import time
+from collections import defaultdict, deque
+from typing import List, Dict, Any
+
+# Numba is an optional accelerator: when available the numeric detector
+# kernels below are LLVM-compiled, otherwise they run as plain Python
+try:
+    import numpy as np
+    from numba import njit
+    _NUMBA = True
+except ImportError:
+    np = None
+    _NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True)
+def _growth_count(recent) -> int:
+    count = 0
+    for i in range(1, len(recent)):
+        if recent[i] > recent[i - 1] * 1.5:
+            count += 1
+    return count
+
+@njit(cache=True)
+def _count_recent_acks(ackTimes, cutoff) -> int:
+    # Timestamps are appended in order, so scan from the newest and stop
+    # at the first entry outside the window
+    count = 0
+    for i in range(len(ackTimes) - 1, -1, -1):
+        if ackTimes[i] > cutoff:
+            count += 1
+        else:
+            break
+    return count
+
+def _count_recent_acks_py(ackTimes, cutoff) -> int:
+    # Pure-Python twin of the kernel above for when numba is absent:
+    # reversed() iteration is O(1) per step on a deque, whereas indexing
+    # from the end costs O(distance) per access
+    count = 0
+    for t in reversed(ackTimes):
+        if t > cutoff:
+            count += 1
+        else:
+            break
+    return count
 
 class TrafficPattern:
+    # Allocated per packet; __slots__ avoids a per-instance __dict__
+    __slots__ = ('timestamp', 'sourceIP', 'destinationIP', 'sourcePort', 'destinationPort',
+                 'sequenceNumber', 'ackNumber', 'windowSize', 'flags', 'dataLength', 'connectionKey')
+
     def __init__(self, timestamp: int, sourceIP: str, destinationIP: str, sourcePort: int, destinationPort: int,
                  sequenceNumber: int, ackNumber: int, windowSize: int, flags: List[str], dataLength: int):
         self.timestamp = timestamp
@@ -14,8 +69,12 @@ class TrafficPattern:
         self.windowSize = windowSize
         self.flags = flags
         self.dataLength = dataLength
+        # Interned so every dict keyed by connection shares one string object
+        self.connectionKey = sys.intern(f"{sourceIP}:{sourcePort}")
 
 class AttackSignature:
+    __slots__ = ('rapidACKs', 'abnormalWindowGrowth', 'sequenceGaps', 'suspiciousPattern')
+
     def __init__(self, rapidACKs: bool, abnormalWindowGrowth: bool, sequenceGaps: bool, suspiciousPattern: bool):
         self.rapidACKs = rapidACKs
         self.abnormalWindowGrowth = abnormalWindowGrowth
@@ -23,24 +82,47 @@ class AttackSignature:
         self.suspiciousPattern = suspiciousPattern
 
 class TrafficAnalyzer:
+    # Stale connection keys are purged in bulk instead of per eviction
+    _KEY_REBUILD_EVICTIONS = 1000
+
     def __init__(self):
-        self.trafficHistory: List[TrafficPattern] = []
+        self.trafficHistory: deque = deque(maxlen=10000)
         self.windowSizeHistory: Dict[str, List[int]] = {}
-        self.ackFrequencyMap: Dict[str, List[int]] = {}
+        self.ackFrequencyMap: Dict[str, deque] = {}
+        self.recentPacketsByConnection: Dict[str, deque] = defaultdict(lambda: deque(maxlen=10))
+        # Summary aggregates maintained per packet so get_traffic_summary
+        # never has to rescan the whole history
+        self._connKeys: set = set()
+        self._ackPackets = 0
+        self._evictionsSinceRebuild = 0
+
+    def _append_history(self, packet: TrafficPattern):
+        history = self.trafficHistory
+        if len(history) == history.maxlen:
+            # Bounded deque: the append below evicts the oldest entry
+            evicted = history[0]
+            if "ACK" in evicted.flags:
+                self._ackPackets -= 1
+            self._evictionsSinceRebuild += 1
+            if self._evictionsSinceRebuild >= self._KEY_REBUILD_EVICTIONS:
+                # Connection keys are not ref-counted; rebuild occasionally to
+                # drop keys whose packets have all been evicted
+                self._connKeys = set(p.connectionKey for p in history)
+                self._evictionsSinceRebuild = 0
+        history.append(packet)
+        self._connKeys.add(packet.connectionKey)
+        if "ACK" in packet.flags:
+            self._ackPackets += 1
 
     def analyze_packet(self, packet: TrafficPattern) -> AttackSignature:
-        self.trafficHistory.append(packet)
+        self._append_history(packet)
+        self.recentPacketsByConnection[packet.connectionKey].append(packet)
         self.update_window_size_history(packet)
         self.update_ack_frequency(packet)
-
-        # Trim history to prevent memory issues
-        if len(self.trafficHistory) > 10000:
-            self.trafficHistory = self.trafficHistory[-5000:]
-
         return self.detect_attack_signatures(packet)
 
     def update_window_size_history(self, packet: TrafficPattern):
-        connectionKey = f"{packet.sourceIP}:{packet.sourcePort}"
+        connectionKey = packet.connectionKey
 
         if connectionKey not in self.windowSizeHistory:
             self.windowSizeHistory[connectionKey] = []
@@ -53,20 +135,20 @@ class TrafficAnalyzer:
     def update_ack_frequency(self, packet: TrafficPattern):
         if "ACK" not in packet.flags:
             return
-        connectionKey = f"{packet.sourceIP}:{packet.sourcePort}"
+        connectionKey = packet.connectionKey
         currentTime = packet.timestamp
 
         if connectionKey not in self.ackFrequencyMap:
-            self.ackFrequencyMap[connectionKey] = []
+            self.ackFrequencyMap[connectionKey] = deque()
         ackTimes = self.ackFrequencyMap[connectionKey]
         ackTimes.append(currentTime)
         # Remove old entries (older than 10 seconds)
         cutoffTime = currentTime - 10000
         while ackTimes and ackTimes[0] < cutoffTime:
-            ackTimes.pop(0)
+            ackTimes.popleft()
 
     def detect_attack_signatures(self, packet: TrafficPattern) -> AttackSignature:
-        connectionKey = f"{packet.sourceIP}:{packet.sourcePort}"
+        connectionKey = packet.connectionKey
 
         return AttackSignature(
             rapidACKs=self.detect_rapid_acks(connectionKey),
@@ -80,23 +162,21 @@ class TrafficAnalyzer:
         if not ackTimes or len(ackTimes) < 10:
             return False
         recentTime = int(time.time() * 1000) - 5000
-        recentACKs = [t for t in ackTimes if t > recentTime]
-        return len(recentACKs) > 50
+        if _NUMBA:
+            return _count_recent_acks(np.fromiter(ackTimes, dtype=np.int64), recentTime) > 50
+        return _count_recent_acks_py(ackTimes, recentTime) > 50
 
     def detect_abnormal_window_growth(self, connectionKey: str) -> bool:
         windowHistory = self.windowSizeHistory.get(connectionKey)
         if not windowHistory or len(windowHistory) < 5:
             return False
         recent = windowHistory[-5:]
-        growthCount = 0
-        for i in range(1, len(recent)):
-            if recent[i] > recent[i-1] * 1.5:
-                growthCount += 1
-        return growthCount >= 3
+        if _NUMBA:
+            recent = np.fromiter(recent, dtype=np.float64)
+        return _growth_count(recent) >= 3
 
     def detect_sequence_gaps(self, packet: TrafficPattern) -> bool:
-        recentPackets = [p for p in self.trafficHistory
-                         if p.sourceIP == packet.sourceIP and p.sourcePort == packet.sourcePort][-10:]
+        recentPackets = self.recentPacketsByConnection[packet.connectionKey]
         if len(recentPackets) < 2:
             return False
         lastPacket = recentPackets[-2]
@@ -109,9 +189,9 @@ class TrafficAnalyzer:
         return rapidACKs and abnormalWindowGrowth
 
     def get_traffic_summary(self) -> Dict[str, Any]:
-        connectionCount = len(set(f"{p.sourceIP}:{p.sourcePort}" for p in self.trafficHistory))
+        connectionCount = len(self._connKeys)
         totalPackets = len(self.trafficHistory)
-        ackPackets = sum(1 for p in self.trafficHistory if "ACK" in p.flags)
+        ackPackets = self._ackPackets
         ackPercentage = (ackPackets / totalPackets) * 100 if totalPackets > 0 else 0
         timeRange = {
             "start": self.trafficHistory[0].timestamp if self.trafficHistory else 0,
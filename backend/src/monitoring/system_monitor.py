@@ -4,12 +4,32 @@ from typing import Callable, Optional, List, Dict
 import os
 import psutil
 
+# Platform support never changes at runtime; resolve once instead of probing
+# with hasattr on every collection tick
+_getloadavg = getattr(os, "getloadavg", lambda: (0.0, 0.0, 0.0))
+
 class SystemMonitor:
-    def __init__(self, monitoring_interval: float = 1.0):
-        self.monitoring_interval = monitoring_interval  # seconds
+    def __init__(self, monitoring_interval: float = 1.0, cache_ttl: float = 0.5, slow_interval: float = 5.0):
+        self.monitoring_interval = monitoring_interval  # seconds, fast tier (cpu/memory)
+        self.slow_interval = slow_interval  # seconds, slow tier (network counters)
         self._interval_thread: Optional[threading.Thread] = None
         self._running = False
         self._metrics_callbacks: List[Callable[[Dict], None]] = []
+        # Slow-tier samples are reused between refreshes
+        self._last_net = None
+        self._last_net_ts = 0.0
+        # Per-interval rates derived from consecutive counter samples
+        self._net_rates = {
+            "bytesRecvPerSec": 0.0,
+            "bytesSentPerSec": 0.0,
+            "packetsRecvPerSec": 0.0,
+            "packetsSentPerSec": 0.0
+        }
+        # Short-lived cache so many concurrent get_metrics() callers share
+        # one psutil collection cycle
+        self._cache: Optional[Dict] = None
+        self._cache_ts = 0.0
+        self._cache_ttl = cache_ttl
 
     def start(self):
         if self._running:
@@ -40,11 +60,29 @@ class SystemMonitor:
             time.sleep(self.monitoring_interval)
 
     def _collect_metrics(self) -> Dict:
+        now = time.monotonic()
+        if self._cache is not None and now - self._cache_ts < self._cache_ttl:
+            return self._cache
         cpu_usage = psutil.cpu_percent(interval=None)
-        load_avg = os.getloadavg() if hasattr(os, "getloadavg") else [0.0, 0.0, 0.0]
+        load_avg = _getloadavg()
         mem = psutil.virtual_memory()
-        net_io = psutil.net_io_counters()
-        # psutil does not provide per-interval packet deltas natively (advanced: track previous values if needed)
+        # Network counters are the expensive tier: refresh every slow_interval only
+        if self._last_net is None or now - self._last_net_ts >= self.slow_interval:
+            net_sample = psutil.net_io_counters()
+            if self._last_net is not None:
+                dt = now - self._last_net_ts
+                if dt > 0:
+                    # Cumulative counters -> per-second rates, so the dashboard
+                    # does not have to diff consecutive samples itself
+                    self._net_rates = {
+                        "bytesRecvPerSec": (net_sample.bytes_recv - self._last_net.bytes_recv) / dt,
+                        "bytesSentPerSec": (net_sample.bytes_sent - self._last_net.bytes_sent) / dt,
+                        "packetsRecvPerSec": (net_sample.packets_recv - self._last_net.packets_recv) / dt,
+                        "packetsSentPerSec": (net_sample.packets_sent - self._last_net.packets_sent) / dt
+                    }
+            self._last_net = net_sample
+            self._last_net_ts = now
+        net_io = self._last_net
         metrics = {
             "timestamp": int(time.time() * 1000),
             "cpu": {
@@ -61,9 +99,12 @@ class SystemMonitor:
                 "bytesReceived": net_io.bytes_recv,
                 "bytesSent": net_io.bytes_sent,
                 "packetsReceived": net_io.packets_recv,
-                "packetsSent": net_io.packets_sent
+                "packetsSent": net_io.packets_sent,
+                **self._net_rates
             }
         }
+        self._cache = metrics
+        self._cache_ts = now
         return metrics
 
 # --- Example Usage ---
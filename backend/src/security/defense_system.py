@@ -1,6 +1,107 @@
+import queue
 import time
 import threading
-from typing import Dict, List, Set, Optional, Callable, Any
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from itertools import islice
+
+from .expiry_scheduler import ExpiryScheduler
+from typing import Dict, List, Set, Optional, Callable, Any, Tuple
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+# Numba is an optional accelerator: when available the numeric validation
+# kernels below are LLVM-compiled, otherwise they run as plain Python
+try:
+    from numba import njit
+    _NUMBA = True
+except ImportError:
+    _NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+# Validation kernels work on primitive scalars and return small int codes;
+# the human-readable reasons are only formatted on the rejection path
+
+ACK_OK = 0
+ACK_SUSPICIOUS_ADVANCE = 1
+ACK_REGRESSION = 2
+
+@njit(cache=True)
+def _ack_check(ack, lastValidAck, suspiciousThreshold):
+    if ack - lastValidAck > suspiciousThreshold:
+        return ACK_SUSPICIOUS_ADVANCE
+    if ack < lastValidAck - 1024 and lastValidAck > 1024:
+        return ACK_REGRESSION
+    return ACK_OK
+
+@njit(cache=True)
+def _rate_check(tokens, lastRefill, now_ms, rate):
+    # Integer token bucket: refill rate tokens/second up to a 3x burst,
+    # spend one token per ACK, reject once the bucket runs dry
+    burst = rate * 3
+    if tokens < 0:  # fresh connection: start with a full bucket
+        tokens = burst
+    addition = ((now_ms - lastRefill) * rate) // 1000
+    if addition > 0:
+        tokens = min(burst, tokens + addition)
+        lastRefill = now_ms
+    if tokens <= 0:
+        # Empty: clamp at zero so the next refill starts from the floor
+        return False, 0, lastRefill
+    return True, tokens - 1, lastRefill
+
+@njit(cache=True)
+def _seq_deviation(seq, expectedSeq):
+    if expectedSeq > 0:
+        return abs(seq - expectedSeq)
+    return 0
+
+@njit(cache=True)
+def _window_growth(windowSize, prevWindow, maxGrowthRate):
+    # Returns the growth rate when it exceeds the limit, else 0.0
+    if prevWindow > 0:
+        growthRate = windowSize / prevWindow
+        if growthRate > maxGrowthRate:
+            return growthRate
+    return 0.0
+
+# TCP flag bits (standard header bit positions); checks are a single AND
+# instead of scanning a list of strings per packet
+FLAG_FIN = 1 << 0
+FLAG_SYN = 1 << 1
+FLAG_RST = 1 << 2
+FLAG_PSH = 1 << 3
+FLAG_ACK = 1 << 4
+FLAG_URG = 1 << 5
+
+# Bits of the precomputed check gate mask; recomputed when config changes
+# so the per-packet path tests one int instead of five config attributes
+CHECK_ACK_VALIDATION = 1 << 0
+CHECK_RATE_LIMITING = 1 << 1
+CHECK_SEQUENCE_TRACKING = 1 << 2
+CHECK_ADAPTIVE_WINDOW = 1 << 3
+CHECK_ANOMALY_DETECTION = 1 << 4
+
+_FLAG_BITS = {
+    'FIN': FLAG_FIN, 'SYN': FLAG_SYN, 'RST': FLAG_RST,
+    'PSH': FLAG_PSH, 'ACK': FLAG_ACK, 'URG': FLAG_URG
+}
+
+def _flags_to_mask(flags) -> int:
+    # Callers may still pass the legacy list of flag names
+    if isinstance(flags, int):
+        return flags
+    mask = 0
+    for flag in flags:
+        mask |= _FLAG_BITS.get(flag, 0)
+    return mask
 
 class DefenseConfig:
     def __init__(self, **kwargs):
@@ -17,6 +118,12 @@ class DefenseConfig:
         self.quarantineDuration = kwargs.get("quarantineDuration", 300000) # ms
 
 class ConnectionState:
+    # One instance per tracked connection; __slots__ avoids a per-instance
+    # __dict__ and speeds the attribute-heavy cleanup/metrics scans
+    __slots__ = ('ip', 'port', 'expectedSeq', 'expectedAck', 'lastValidAck', 'windowSize',
+                 'ackTokens', 'lastACKTime', 'suspicious', 'quarantined', 'quarantineUntil',
+                 'anomalyScore')
+
     def __init__(self, ip, port):
         self.ip = ip
         self.port = port
@@ -24,8 +131,8 @@ class ConnectionState:
         self.expectedAck = 0
         self.lastValidAck = 0
         self.windowSize = 0
-        self.ackCount = 0
-        self.lastACKTime = int(time.time() * 1000)
+        self.ackTokens = -1  # -1 = bucket not yet initialized
+        self.lastACKTime = _now_ms()
         self.suspicious = False
         self.quarantined = False
         self.quarantineUntil = 0
@@ -49,143 +156,219 @@ class AttackSignature:
 class DefenseSystem:
     def __init__(self, config: Optional[Dict] = None):
         self.config = DefenseConfig(**(config or {}))
-        self.connectionStates: Dict[str, ConnectionState] = {}
-        self.quarantinedIPs: Set[str] = set()
-        self.defenseActions: List[DefenseAction] = []
+        # Keyed by (ip, port): tuple hashing avoids formatting a string key
+        # on every packet
+        self.connectionStates: Dict[Tuple[str, int], ConnectionState] = {}
+        # IP -> connection keys, so quarantine updates touch only that IP's
+        # connections instead of scanning every tracked state
+        self.connectionsByIP: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+        # Guards structural mutation of the state tables, which happens from
+        # both the request threads and the cleanup/expiry threads
+        self._stateLock = threading.RLock()
+        # Read-mostly: swapped wholesale on update so is_quarantined stays an
+        # unlocked membership check on an immutable set
+        self.quarantinedIPs: frozenset = frozenset()
+        # Bounded ring: overflow drops the oldest action in O(1) instead of
+        # reallocating a trimmed list copy
+        self.defenseActions: deque = deque(maxlen=1000)
+        # Parallel timestamp ring: actions arrive in time order, so recent
+        # windows can be located with bisect instead of a full scan
+        self._actionTimestamps: deque = deque(maxlen=1000)
         self.cleanupInterval: Optional[threading.Timer] = None
+        # One shared worker thread for every timed expiry (quarantines,
+        # and the middleware's blocklist/connection-count expiries)
+        self.expiryScheduler = ExpiryScheduler()
         self.callbacks: List[Callable[[str, Any], None]] = []
+        # Actions are announced (callbacks + logging) from a pump thread so
+        # the validate hot path never blocks on stdout or handlers
+        self._actionQueue: queue.SimpleQueue = queue.SimpleQueue()
+        self._actionPump = threading.Thread(target=self._pump_actions, daemon=True)
+        self._actionPump.start()
+        self._checks_mask = self._compute_checks_mask()
+        # Plain-dict snapshot handed out by get_defense_metrics; rebuilt only
+        # when the config actually changes (must stay JSON-serializable — it
+        # goes straight into jsonify and the Socket.IO metrics emit)
+        self._configSnapshot = dict(vars(self.config))
         self._start_defense_monitoring()
         print(f'🛡️ Defense System initialized with config: {vars(self.config)}')
 
+    def _compute_checks_mask(self) -> int:
+        config = self.config
+        return ((CHECK_ACK_VALIDATION if config.ackValidationEnabled else 0)
+                | (CHECK_RATE_LIMITING if config.rateLimitingEnabled else 0)
+                | (CHECK_SEQUENCE_TRACKING if config.sequenceTrackingEnabled else 0)
+                | (CHECK_ADAPTIVE_WINDOW if config.adaptiveWindowEnabled else 0)
+                | (CHECK_ANOMALY_DETECTION if config.anomalyDetectionEnabled else 0))
+
     def on(self, event: str, callback: Callable[[Any], None]):
         # For now only 'defenseAction' event is supported
         if event == 'defenseAction':
             self.callbacks.append(callback)
 
     def validate_connection(self, ip, port, seq, ack, windowSize, flags=None):
-        if flags is None:
-            flags = []
-        connectionId = f"{ip}:{port}"
+        flags = _flags_to_mask(flags) if flags is not None else 0
+        key = (ip, port)
+        # One clock read per packet, threaded through the checks below
+        now_ms = _now_ms()
         # Quarantine check
         if self.is_quarantined(ip):
             return {
                 "allowed": False,
-                "action": self._create_defense_action('block', 'IP is quarantined', 'high', connectionId)
+                "action": self._create_defense_action('block', 'IP is quarantined', 'high', key, now_ms)
             }
-        state = self._get_or_create_connection_state(ip, port)
+        state = self._get_or_create_connection_state(key)
         attackSignature = AttackSignature()
-        result = self._run_defense_checks(state, seq, ack, windowSize, flags, attackSignature)
+        result = self._run_defense_checks(state, seq, ack, windowSize, flags, attackSignature, key, now_ms)
         if result["allowed"]:
             self._update_connection_state(state, seq, ack, windowSize)
         return result
 
-    def _run_defense_checks(self, state, seq, ack, windowSize, flags, signature: AttackSignature):
-        connectionId = f"{state.ip}:{state.port}"
+    def validate_batch(self, packets):
+        """Validate an iterable of (ip, port, seq, ack, windowSize, flags)
+        tuples collected over a short window.
+
+        Amortizes the per-packet call overhead: one clock read and one set
+        of attribute lookups per batch instead of per packet. Returns the
+        per-packet result dicts in input order.
+        """
+        now_ms = _now_ms()
+        get_state = self._get_or_create_connection_state
+        run_checks = self._run_defense_checks
+        update_state = self._update_connection_state
+        # Snapshot: the frozenset is swapped atomically on update
+        quarantined = self.quarantinedIPs
+        is_quarantined = quarantined.__contains__
+        results = []
+        append = results.append
+        for ip, port, seq, ack, windowSize, flags in packets:
+            key = (ip, port)
+            if is_quarantined(ip):
+                append({
+                    "allowed": False,
+                    "action": self._create_defense_action('block', 'IP is quarantined', 'high', key, now_ms)
+                })
+                continue
+            state = get_state(key)
+            result = run_checks(state, seq, ack, windowSize, _flags_to_mask(flags),
+                                AttackSignature(), key, now_ms)
+            if result["allowed"]:
+                update_state(state, seq, ack, windowSize)
+            append(result)
+        return results
+
+    def _run_defense_checks(self, state, seq, ack, windowSize, flags, signature: AttackSignature, key=None, now_ms=None):
+        connectionId = key if key is not None else (state.ip, state.port)
+        if now_ms is None:
+            now_ms = _now_ms()
+        flags = _flags_to_mask(flags)
+        checks = self._checks_mask
         isLikelyAttack = state.suspicious or state.anomalyScore > 0.5
         # 1. ACK Validation
-        if self.config.ackValidationEnabled and 'ACK' in flags and isLikelyAttack:
+        if checks & CHECK_ACK_VALIDATION and flags & FLAG_ACK and isLikelyAttack:
             ackValidation = self._validate_ack_number(state, ack)
             if not ackValidation["valid"]:
                 self._update_anomaly_score(state, 0.3)
                 return {
                     "allowed": False,
-                    "action": self._create_defense_action('reject_packet', ackValidation["reason"], 'high', connectionId)
+                    "action": self._create_defense_action('reject_packet', ackValidation["reason"], 'high', connectionId, now_ms)
                 }
         # 2. Rate Limiting
-        if self.config.rateLimitingEnabled and 'ACK' in flags:
-            rateLimitCheck = self._check_ack_rate_limit(state)
+        if checks & CHECK_RATE_LIMITING and flags & FLAG_ACK:
+            rateLimitCheck = self._check_ack_rate_limit(state, now_ms)
             if not rateLimitCheck["allowed"]:
                 self._update_anomaly_score(state, 0.2)
                 return {
                     "allowed": False,
-                    "action": self._create_defense_action('rate_limit', rateLimitCheck["reason"], 'medium', connectionId)
+                    "action": self._create_defense_action('rate_limit', rateLimitCheck["reason"], 'medium', connectionId, now_ms)
                 }
         # 3. Sequence Tracking
-        if self.config.sequenceTrackingEnabled:
+        if checks & CHECK_SEQUENCE_TRACKING:
             seqValidation = self._validate_sequence_number(state, seq)
             if not seqValidation["valid"]:
                 self._update_anomaly_score(state, 0.25)
                 return {
                     "allowed": False,
-                    "action": self._create_defense_action('reject_packet', seqValidation["reason"], 'medium', connectionId)
+                    "action": self._create_defense_action('reject_packet', seqValidation["reason"], 'medium', connectionId, now_ms)
                 }
         # 4. Window Size Validation
-        if self.config.adaptiveWindowEnabled:
+        if checks & CHECK_ADAPTIVE_WINDOW:
             windowValidation = self._validate_window_size(state, windowSize)
             if not windowValidation["valid"]:
                 self._update_anomaly_score(state, 0.2)
                 # Don't block, just alert
-                self._create_defense_action('alert', windowValidation["reason"], 'medium', connectionId)
+                self._create_defense_action('alert', windowValidation["reason"], 'medium', connectionId, now_ms)
         # 5. Anomaly Detection
-        if self.config.anomalyDetectionEnabled:
+        if checks & CHECK_ANOMALY_DETECTION:
             anomalyCheck = self._detect_anomalies(state, signature)
             if anomalyCheck["anomalous"]:
                 self._update_anomaly_score(state, 0.4)
                 if state.anomalyScore >= self.config.suspiciousPatternThreshold:
-                    self._quarantine_ip(state.ip)
+                    self._quarantine_ip(state.ip, now_ms)
                     return {
                         "allowed": False,
-                        "action": self._create_defense_action('quarantine', anomalyCheck["reason"], 'critical', connectionId)
+                        "action": self._create_defense_action('quarantine', anomalyCheck["reason"], 'critical', connectionId, now_ms)
                     }
                 return {
                     "allowed": False,
-                    "action": self._create_defense_action('block', anomalyCheck["reason"], 'high', connectionId)
+                    "action": self._create_defense_action('block', anomalyCheck["reason"], 'high', connectionId, now_ms)
                 }
         return {"allowed": True}
 
     def _validate_ack_number(self, state: ConnectionState, ack: int):
-        ackAdvance = ack - state.lastValidAck
         suspiciousAdvanceThreshold = self.config.maxSequenceGap * 2
-        if ackAdvance > suspiciousAdvanceThreshold:
+        code = _ack_check(ack, state.lastValidAck, suspiciousAdvanceThreshold)
+        if code == ACK_SUSPICIOUS_ADVANCE:
             return {"valid": False,
-                    "reason": f"Highly suspicious ACK detected: advancing {ackAdvance} bytes beyond expected (threshold: {suspiciousAdvanceThreshold})"}
-        if ack < state.lastValidAck - 1024 and state.lastValidAck > 1024:
+                    "reason": f"Highly suspicious ACK detected: advancing {ack - state.lastValidAck} bytes beyond expected (threshold: {suspiciousAdvanceThreshold})"}
+        if code == ACK_REGRESSION:
             return {"valid": False, "reason": f"Significant ACK regression detected: {ack} << {state.lastValidAck}"}
         return {"valid": True, "reason": ""}
 
-    def _check_ack_rate_limit(self, state: ConnectionState):
-        now = int(time.time() * 1000)
-        timeSinceLastACK = now - state.lastACKTime
-        if timeSinceLastACK > 1000:
-            state.ackCount = 0
-            state.lastACKTime = now
-        state.ackCount += 1
-        effectiveLimit = self.config.maxACKsPerSecond * 3
-        if state.ackCount > effectiveLimit:
+    def _check_ack_rate_limit(self, state: ConnectionState, now_ms=None):
+        now = now_ms if now_ms is not None else _now_ms()
+        rate = self.config.maxACKsPerSecond
+        allowed, state.ackTokens, state.lastACKTime = _rate_check(
+            state.ackTokens, state.lastACKTime, now, rate)
+        if not allowed:
             return {"allowed": False,
-                    "reason": f"Extreme ACK rate limit exceeded: {state.ackCount} ACKs/second (limit: {effectiveLimit})"}
+                    "reason": f"Extreme ACK rate limit exceeded: token bucket exhausted (refill: {rate}/s, burst: {rate * 3})"}
         return {"allowed": True, "reason": ""}
 
     def _validate_sequence_number(self, state: ConnectionState, seq: int):
         maxSeqDeviation = 65536
-        if state.expectedSeq > 0:
-            seqDeviation = abs(seq - state.expectedSeq)
-            if seqDeviation > maxSeqDeviation:
-                return {"valid": False, "reason": f"Sequence number deviation too large: {seqDeviation} bytes"}
+        seqDeviation = _seq_deviation(seq, state.expectedSeq)
+        if seqDeviation > maxSeqDeviation:
+            return {"valid": False, "reason": f"Sequence number deviation too large: {seqDeviation} bytes"}
         return {"valid": True, "reason": ""}
 
     def _validate_window_size(self, state: ConnectionState, windowSize: int):
-        if state.windowSize > 0:
-            growthRate = windowSize / state.windowSize
-            if growthRate > self.config.maxWindowGrowthRate:
-                return {"valid": False, "reason": f"Abnormal window growth: {growthRate:.2f}x increase"}
+        growthRate = _window_growth(windowSize, state.windowSize, self.config.maxWindowGrowthRate)
+        if growthRate:
+            return {"valid": False, "reason": f"Abnormal window growth: {growthRate:.2f}x increase"}
         return {"valid": True, "reason": ""}
 
     def _detect_anomalies(self, state: ConnectionState, signature: AttackSignature):
-        anomalies = []
-        if signature.rapidACKs: anomalies.append('rapid ACK pattern')
-        if signature.abnormalWindowGrowth: anomalies.append('abnormal window growth')
-        if signature.sequenceGaps: anomalies.append('large sequence gaps')
-        if signature.suspiciousPattern: anomalies.append('suspicious traffic pattern')
-        if len(anomalies) >= 2:
+        indicatorCount = (signature.rapidACKs + signature.abnormalWindowGrowth +
+                          signature.sequenceGaps + signature.suspiciousPattern)
+        if indicatorCount >= 2:
+            # Only build the description strings once an anomaly actually fires
+            anomalies = []
+            if signature.rapidACKs: anomalies.append('rapid ACK pattern')
+            if signature.abnormalWindowGrowth: anomalies.append('abnormal window growth')
+            if signature.sequenceGaps: anomalies.append('large sequence gaps')
+            if signature.suspiciousPattern: anomalies.append('suspicious traffic pattern')
             return {"anomalous": True, "reason": f"Multiple attack indicators: {', '.join(anomalies)}"}
         return {"anomalous": False, "reason": ""}
 
-    def _get_or_create_connection_state(self, ip, port) -> ConnectionState:
-        connectionId = f"{ip}:{port}"
-        if connectionId not in self.connectionStates:
-            self.connectionStates[connectionId] = ConnectionState(ip, port)
-        return self.connectionStates[connectionId]
+    def _get_or_create_connection_state(self, key: Tuple[str, int]) -> ConnectionState:
+        state = self.connectionStates.get(key)
+        if state is None:
+            with self._stateLock:
+                state = self.connectionStates.get(key)
+                if state is None:
+                    state = self.connectionStates[key] = ConnectionState(key[0], key[1])
+                    self.connectionsByIP[key[0]].add(key)
+        return state
 
     def _update_connection_state(self, state, seq, ack, windowSize):
         state.expectedSeq = seq
@@ -199,23 +382,26 @@ class DefenseSystem:
         if state.anomalyScore > 0.5:
             state.suspicious = True
 
-    def _quarantine_ip(self, ip):
+    def _quarantine_ip(self, ip, now_ms=None):
         if not self.config.quarantineEnabled:
             return
-        self.quarantinedIPs.add(ip)
-        for state in self.connectionStates.values():
-            if state.ip == ip:
+        if now_ms is None:
+            now_ms = _now_ms()
+        with self._stateLock:
+            self.quarantinedIPs = self.quarantinedIPs | {ip}
+            for key in self.connectionsByIP.get(ip, ()):
+                state = self.connectionStates[key]
                 state.quarantined = True
-                state.quarantineUntil = int(time.time() * 1000) + self.config.quarantineDuration
+                state.quarantineUntil = now_ms + self.config.quarantineDuration
         print(f"🚫 IP {ip} quarantined for {self.config.quarantineDuration / 1000} seconds")
         # Schedule auto-remove from quarantine
-        timer = threading.Timer(self.config.quarantineDuration / 1000, self._remove_from_quarantine, args=(ip,))
-        timer.start()
+        self.expiryScheduler.schedule(self.config.quarantineDuration / 1000, self._remove_from_quarantine, ip)
 
     def _remove_from_quarantine(self, ip):
-        self.quarantinedIPs.discard(ip)
-        for state in self.connectionStates.values():
-            if state.ip == ip:
+        with self._stateLock:
+            self.quarantinedIPs = self.quarantinedIPs - {ip}
+            for key in self.connectionsByIP.get(ip, ()):
+                state = self.connectionStates[key]
                 state.quarantined = False
                 state.quarantineUntil = 0
                 state.anomalyScore = 0
@@ -224,16 +410,26 @@ class DefenseSystem:
     def is_quarantined(self, ip):
         return ip in self.quarantinedIPs
 
-    def _create_defense_action(self, type_, reason, severity, connectionId):
-        action = DefenseAction(type_, reason, severity, int(time.time() * 1000), connectionId)
+    def _create_defense_action(self, type_, reason, severity, connectionId, now_ms=None):
+        if isinstance(connectionId, tuple):
+            # Format the human-readable id lazily, only when an action fires
+            connectionId = f"{connectionId[0]}:{connectionId[1]}"
+        action = DefenseAction(type_, reason, severity,
+                               now_ms if now_ms is not None else _now_ms(), connectionId)
         self.defenseActions.append(action)
-        if len(self.defenseActions) > 1000:
-            self.defenseActions = self.defenseActions[-500:]
-        for cb in self.callbacks:
-            cb('defenseAction', action)
-        print(f"🛡️ Defense Action: {type_} - {reason} ({severity})")
+        self._actionTimestamps.append(action.timestamp)
+        self._actionQueue.put(action)
         return vars(action)
 
+    def _pump_actions(self):
+        while True:
+            action = self._actionQueue.get()
+            if action is None:  # destroy() sentinel
+                return
+            print(f"🛡️ Defense Action: {action.type} - {action.reason} ({action.severity})")
+            for cb in self.callbacks:
+                cb('defenseAction', action)
+
     def _start_defense_monitoring(self):
         def periodic():
             self._cleanup_expired_states()
@@ -243,39 +439,47 @@ class DefenseSystem:
         periodic()
 
     def _cleanup_expired_states(self):
-        now = int(time.time() * 1000)
+        now = _now_ms()
         expiredConnections = []
-        for connectionId, state in list(self.connectionStates.items()):
-            if now - state.lastACKTime > 600000:
-                expiredConnections.append(connectionId)
-            if state.quarantined and now > state.quarantineUntil:
-                self._remove_from_quarantine(state.ip)
-        for connectionId in expiredConnections:
-            del self.connectionStates[connectionId]
+        with self._stateLock:
+            for connectionId, state in list(self.connectionStates.items()):
+                if now - state.lastACKTime > 600000:
+                    expiredConnections.append(connectionId)
+                if state.quarantined and now > state.quarantineUntil:
+                    self._remove_from_quarantine(state.ip)
+            for connectionId in expiredConnections:
+                del self.connectionStates[connectionId]
+                ipKeys = self.connectionsByIP.get(connectionId[0])
+                if ipKeys is not None:
+                    ipKeys.discard(connectionId)
+                    if not ipKeys:
+                        del self.connectionsByIP[connectionId[0]]
         if expiredConnections:
             print(f"🧹 Cleaned up {len(expiredConnections)} expired connection states")
 
     def get_defense_metrics(self):
-        now = int(time.time() * 1000)
-        recentActions = [a for a in self.defenseActions if now - a.timestamp < 300000]
-        actionsByType = {}
-        actionsBySeverity = {}
-        for action in recentActions:
-            actionsByType[action.type] = actionsByType.get(action.type, 0) + 1
-            actionsBySeverity[action.severity] = actionsBySeverity.get(action.severity, 0) + 1
+        now = _now_ms()
+        recentStart = bisect_left(self._actionTimestamps, now - 300000)
+        recentCount = len(self.defenseActions) - recentStart
+        # Counter's C-level counting over a generator beats a manual
+        # get()+1 loop
+        actionsByType = Counter(a.type for a in islice(self.defenseActions, recentStart, None))
+        actionsBySeverity = Counter(a.severity for a in islice(self.defenseActions, recentStart, None))
         return {
             "totalConnections": len(self.connectionStates),
             "quarantinedIPs": len(self.quarantinedIPs),
             "suspiciousConnections": sum(1 for s in self.connectionStates.values() if s.suspicious),
-            "recentActions": len(recentActions),
-            "actionsByType": actionsByType,
-            "actionsBySeverity": actionsBySeverity,
-            "config": vars(self.config)
+            "recentActions": recentCount,
+            "actionsByType": dict(actionsByType),
+            "actionsBySeverity": dict(actionsBySeverity),
+            "config": self._configSnapshot
         }
 
     def update_config(self, newConfig: Dict):
         for k, v in newConfig.items():
             setattr(self.config, k, v)
+        self._checks_mask = self._compute_checks_mask()
+        self._configSnapshot = dict(vars(self.config))
         print(f'🔧 Defense configuration updated: {newConfig}')
 
     def force_remove_from_quarantine(self, ip):
@@ -285,24 +489,28 @@ class DefenseSystem:
         return False
 
     def get_connection_state(self, ip, port):
-        return self.connectionStates.get(f"{ip}:{port}")
+        return self.connectionStates.get((ip, port))
 
     def mark_connection_suspicious(self, ip, port, reason):
-        state = self._get_or_create_connection_state(ip, port)
+        state = self._get_or_create_connection_state((ip, port))
         state.suspicious = True
         state.anomalyScore = min(1.0, state.anomalyScore + 0.5)
         print(f"🚨 Connection {ip}:{port} marked as suspicious: {reason}")
-        self._create_defense_action('alert', f"Connection marked suspicious: {reason}", 'medium', f"{ip}:{port}")
+        self._create_defense_action('alert', f"Connection marked suspicious: {reason}", 'medium', (ip, port))
 
     def is_connection_suspicious(self, ip, port):
-        state = self.connectionStates.get(f"{ip}:{port}")
+        state = self.connectionStates.get((ip, port))
         return state.suspicious if state else False
 
     def destroy(self):
         if self.cleanupInterval:
             self.cleanupInterval.cancel()
             self.cleanupInterval = None
-        self.connectionStates.clear()
-        self.quarantinedIPs.clear()
+        self.expiryScheduler.stop()
+        self._actionQueue.put(None)
+        with self._stateLock:
+            self.connectionStates.clear()
+            self.connectionsByIP.clear()
+            self.quarantinedIPs = frozenset()
         self.callbacks.clear()
         print('🛡️ Defense System destroyed')
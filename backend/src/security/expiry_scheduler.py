@@ -0,0 +1,51 @@
+import heapq
+import itertools
+import threading
+import time
+
+class ExpiryScheduler:
+    """Runs deferred callbacks from a single background thread.
+
+    Replaces per-event threading.Timer usage: quarantines, blocklist
+    expiries and connection-count decrements each used to spawn their own
+    OS thread, which does not scale when an attack quarantines thousands
+    of IPs. One thread sleeping on a min-heap of (deadline, callback)
+    entries handles any number of pending expiries.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()  # tie-break equal deadlines
+        self._cv = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay_seconds: float, callback, *args):
+        deadline = time.monotonic() + delay_seconds
+        with self._cv:
+            heapq.heappush(self._heap, (deadline, next(self._counter), callback, args))
+            # Wake the worker in case the new entry is the earliest deadline
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._stopped:
+                    if self._heap and self._heap[0][0] <= time.monotonic():
+                        break
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cv.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, callback, args = heapq.heappop(self._heap)
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"⚠️ Expiry callback failed: {e}")
+
+    def stop(self):
+        with self._cv:
+            self._stopped = True
+            self._heap.clear()
+            self._cv.notify()
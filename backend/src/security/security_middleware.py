@@ -1,11 +1,47 @@
 import time
-import math
-import threading
+import re
+from functools import lru_cache
 from typing import Callable, Dict, List, Set, Optional, Any
-from flask import request, g, jsonify, Response, after_this_request
+from flask import request, g, jsonify, Response
 
 from .defense_system import DefenseSystem
 
+# User-agent needles compiled once into single alternation automata: one
+# scan of the UA string per request instead of one substring search per
+# needle
+_LEGITIMATE_AGENTS = (
+    "Mozilla/", "Chrome/", "Safari/", "Firefox/", "Edge/", "Opera/", "curl/", "wget/",
+    "Node.js", "axios/", "okhttp/", "Python-urllib", "java/", "Go-http-client",
+    "libcurl", "Postman", "Insomnia"
+)
+_LEGIT_AGENT_RE = re.compile("|".join(map(re.escape, _LEGITIMATE_AGENTS)))
+
+_MALICIOUS_AGENTS = (
+    "OptimisticACK-Attack-Tool", "OptimisticACK-HLS-Client",
+    "exploit-framework", "attack-simulator"
+)
+_MALICIOUS_AGENT_RE = re.compile("|".join(map(re.escape, _MALICIOUS_AGENTS)))
+
+_SUSPICIOUS_HEADERS = ("X-Attack-Type", "X-Exploit", "X-Malicious", "X-Optimistic-Ack")
+
+# Single-pass Range parse; anything that does not match the simple
+# bytes=start-end form is treated as abnormal without raising
+_RANGE_RE = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+# Valid HLS segment names in one pass; stricter than the old
+# startswith/endswith chain, which accepted any segment*.ts name
+_SEGMENT_RE = re.compile(r"^(?:segment\d+\.ts|playlist\.m3u8)$")
+
+@lru_cache(maxsize=4096)
+def _ua_is_legit(userAgent: str) -> bool:
+    # A handful of UA strings repeat across almost all traffic; cache the
+    # classification so repeat agents skip the scan entirely
+    if _LEGIT_AGENT_RE.search(userAgent):
+        return True
+    if not userAgent or userAgent.strip() == "":
+        return True
+    return False
+
 class SecurityMiddleware:
     def __init__(self, app, config: Optional[Dict] = None):
         # Store config with defaults for HTTP/web
@@ -29,14 +65,20 @@ class SecurityMiddleware:
             **(config or {})
         }
         self.defenseSystem = DefenseSystem(self.config)
+        # Timed expiries share the defense system's scheduler thread rather
+        # than spawning a threading.Timer per event
+        self.expiryScheduler = self.defenseSystem.expiryScheduler
         self.connectionCounts: Dict[str, int] = {}
-        self.blocklist: Set[str] = set()
+        # Read-mostly: swapped wholesale on update so is_blocked stays an
+        # unlocked membership check on an immutable set
+        self.blocklist: frozenset = frozenset()
         self.lastCleanup = int(time.time() * 1000)
         self.setup_defense_event_handlers()
         print("🔐 Security Middleware initialized - configured for legitimate traffic protection")
         # Register app-wide request/response hooks
         app.before_request(self._request_filter)
         app.after_request(self._add_security_headers)
+        app.after_request(self._log_download)
 
     def setup_defense_event_handlers(self):
         def handler(event, action):
@@ -120,18 +162,14 @@ class SecurityMiddleware:
             return None
         if req.headers.get("X-Simulate-Attack", "") == "optimistic-ack":
             return {"reason": "Explicit optimistic ACK attack simulation detected"}
-        maliciousAgents = [
-            "OptimisticACK-Attack-Tool", "OptimisticACK-HLS-Client",
-            "exploit-framework", "attack-simulator"
-        ]
-        for maliciousAgent in maliciousAgents:
-            if maliciousAgent in userAgent:
-                clientIP = self.get_client_ip(req)
-                clientPort = int(req.headers.get("X-Forwarded-Port", 0))
-                self.defenseSystem.mark_connection_suspicious(clientIP, clientPort, f"Malicious user agent: {maliciousAgent}")
-                return {"reason": f"Malicious user agent detected: {maliciousAgent}"}
-        suspiciousHeaders = ["X-Attack-Type", "X-Exploit", "X-Malicious", "X-Optimistic-Ack"]
-        for header in suspiciousHeaders:
+        maliciousMatch = _MALICIOUS_AGENT_RE.search(userAgent)
+        if maliciousMatch:
+            maliciousAgent = maliciousMatch.group(0)
+            clientIP = self.get_client_ip(req)
+            clientPort = int(req.headers.get("X-Forwarded-Port", 0))
+            self.defenseSystem.mark_connection_suspicious(clientIP, clientPort, f"Malicious user agent: {maliciousAgent}")
+            return {"reason": f"Malicious user agent detected: {maliciousAgent}"}
+        for header in _SUSPICIOUS_HEADERS:
             if req.headers.get(header):
                 return {"reason": f"Suspicious header detected: {header}"}
         requestIP = self.get_client_ip(req)
@@ -143,31 +181,21 @@ class SecurityMiddleware:
         return None
 
     def is_legitimate_client(self, userAgent: str):
-        legitimateAgents = [
-            "Mozilla/", "Chrome/", "Safari/", "Firefox/", "Edge/", "Opera/", "curl/", "wget/",
-            "Node.js", "axios/", "okhttp/", "Python-urllib", "java/", "Go-http-client",
-            "libcurl", "Postman", "Insomnia"
-        ]
-        if any(agent in userAgent for agent in legitimateAgents):
-            return True
-        if not userAgent or userAgent.strip() == "":
-            return True
-        return False
+        return _ua_is_legit(userAgent)
 
     def is_rapid_fire_request(self, ip: str):
         # Could implement with per-IP request tracking
         return False
 
     def is_abnormal_range_request(self, rangeHeader: str):
-        try:
-            parts = rangeHeader.replace("bytes=", "").split("-")
-            start = int(parts[0])
-            end = int(parts[1]) if len(parts) > 1 and parts[1] else None
-            if end and (end - start) > 100 * 1024 * 1024:
-                return True
-            if start < 0 or (end and end < start):
-                return True
-        except Exception:
+        match = _RANGE_RE.match(rangeHeader)
+        if not match:
+            return True
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else None
+        if end and (end - start) > 100 * 1024 * 1024:
+            return True
+        if end and end < start:
             return True
         return False
 
@@ -176,30 +204,37 @@ class SecurityMiddleware:
         segment = req.view_args.get("segment") if req.view_args else None
         if streamId and not str(streamId).isalnum():
             return {"valid": False, "reason": "Invalid stream ID format"}
-        if segment and not (str(segment).startswith("segment") and str(segment).endswith(".ts") or str(segment) == "playlist.m3u8"):
-            return {"valid": False, "reason": "Invalid segment format"}
+        if segment is not None:
+            segmentName = segment if isinstance(segment, str) else str(segment)
+            if not _SEGMENT_RE.match(segmentName):
+                return {"valid": False, "reason": "Invalid segment format"}
         return {"valid": True, "reason": ""}
 
     # =========== Response/Data Handling ============
 
     def track_response(self, clientIP: str):
-        # For simplicity, just log download size via after_this_request
-        @after_this_request
-        def log_download(response):
+        # The logging callback is registered once at init; per request we
+        # only stash the client IP instead of allocating a fresh closure
+        g.client_ip_for_log = clientIP
+
+    def _log_download(self, response: Response):
+        clientIP = g.get("client_ip_for_log")
+        if clientIP is not None:
             content_length = response.content_length or 0
             if content_length > 0:
                 print(f"📊 Transfer completed for {clientIP}: {self.format_bytes(content_length)}")
                 if content_length > 100 * 1024 * 1024:
                     print(f"📈 Large download from {clientIP}: {self.format_bytes(content_length)}")
-            return response
+        return response
 
     def format_bytes(self, bytes_):
         if bytes_ == 0:
             return "0 B"
-        k = 1024
         sizes = ["B", "KB", "MB", "GB"]
-        i = int((bytes_ and (bytes_ > 0)) and (math.log(bytes_) / math.log(k)) or 0)
-        return f"{(bytes_ / (k ** i)):.2f} {sizes[i]}"
+        # Unit index from the bit length: one integer op instead of two logs
+        i = max(0, (int(bytes_).bit_length() - 1) // 10)
+        i = min(i, len(sizes) - 1)
+        return f"{(bytes_ / (1 << (10 * i))):.2f} {sizes[i]}"
 
     # =========== IP/Connection Limiting/Blocklisting ============
 
@@ -216,10 +251,12 @@ class SecurityMiddleware:
                 return False
         self.connectionCounts[ip] = currentConnections + 1
         # Remove after 2 seconds
-        timer = threading.Timer(2, lambda: self.connectionCounts.update({ip: max(0, self.connectionCounts.get(ip, 1) - 1)}))
-        timer.start()
+        self.expiryScheduler.schedule(2, self._decrement_connection_count, ip)
         return True
 
+    def _decrement_connection_count(self, ip):
+        self.connectionCounts[ip] = max(0, self.connectionCounts.get(ip, 1) - 1)
+
     def get_client_ip(self, req):
         if "X-Forwarded-For" in req.headers:
             return req.headers["X-Forwarded-For"].split(",")[0].strip()
@@ -231,10 +268,12 @@ class SecurityMiddleware:
         return ip in self.blocklist
 
     def add_to_blocklist(self, ip):
-        self.blocklist.add(ip)
+        self.blocklist = self.blocklist | {ip}
         print(f"🚫 IP {ip} added to blocklist")
-        timer = threading.Timer(30 * 60, lambda: self.blocklist.discard(ip))
-        timer.start()
+        self.expiryScheduler.schedule(30 * 60, self._remove_from_blocklist, ip)
+
+    def _remove_from_blocklist(self, ip):
+        self.blocklist = self.blocklist - {ip}
 
     # =========== JSON Responses ============
 
@@ -289,7 +328,7 @@ class SecurityMiddleware:
     def destroy(self):
         self.defenseSystem.destroy()
         self.connectionCounts.clear()
-        self.blocklist.clear()
+        self.blocklist = frozenset()
         print("🔐 Security Middleware destroyed")
 
 # --- Usage Example in Flask ---
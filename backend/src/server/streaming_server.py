@@ -252,12 +252,14 @@ class StreamingServer:
             self.app.run(host="0.0.0.0", port=port, threaded=True)
 
     def stop(self):
-        if self.isRunning:
-            self.isRunning = False
-            self.systemMonitor.stop()
-            if self.securityMiddleware:
-                self.securityMiddleware.destroy()
-            print('🛑 Streaming server stopped, defense systems deactivated')
+        # Safe to call even if start() was never reached: the app may be run
+        # through App/socketio rather than self.app.run
+        self.isRunning = False
+        self.systemMonitor.stop()
+        self.connectionAnalyzer.destroy()
+        if self.securityMiddleware:
+            self.securityMiddleware.destroy()
+        print('🛑 Streaming server stopped, defense systems deactivated')
 
     def get_metrics(self):
         base_metrics = {
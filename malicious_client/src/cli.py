@@ -167,10 +167,10 @@ class AttackCLI:
     def format_bytes(self, bytes_num):
         if bytes_num == 0:
             return "0 B"
-        k = 1024
         sizes = ['B', 'KB', 'MB', 'GB']
-        i = int((bytes_num and (bytes_num > 0)) and (math.log(bytes_num) / math.log(k)) or 0)
-        return f"{(bytes_num / pow(k, i)):.2f} {sizes[i]}"
+        # bit_length picks the 1024-power bucket without stringifying the value
+        i = min(3, max(0, (int(bytes_num).bit_length() - 1) // 10))
+        return f"{(bytes_num / (1 << (10 * i))):.2f} {sizes[i]}"
 
     def format_speed(self, bytes_per_second):
         return self.format_bytes(bytes_per_second) + "/s"
@@ -24,6 +24,9 @@ class NetworkMonitor:
         self.last_network_stats = None
         self.primary_interface = ""
         self._running = False
+        # Speed/packet counters are written by the monitor thread and by
+        # every transfer worker; one lock keeps the read-modify-writes whole
+        self._metrics_lock = threading.Lock()
         self.detect_primary_interface()
         self.start_monitoring()
 
@@ -81,10 +84,11 @@ class NetworkMonitor:
                     tx_diff = tx_bytes - self.last_network_stats['tx_bytes']
                     rx_packet_diff = rx_packets - self.last_network_stats['rx_packets']
                     tx_packet_diff = tx_packets - self.last_network_stats['tx_packets']
-                    self.metrics.download_speed = max(0, rx_diff / elapsed)
-                    self.metrics.upload_speed = max(0, tx_diff / elapsed)
-                    self.metrics.packets_per_second = max(0, (rx_packet_diff + tx_packet_diff) / elapsed)
-                    self.metrics.bandwidth = self.metrics.download_speed + self.metrics.upload_speed
+                    with self._metrics_lock:
+                        self.metrics.download_speed = max(0, rx_diff / elapsed)
+                        self.metrics.upload_speed = max(0, tx_diff / elapsed)
+                        self.metrics.packets_per_second = max(0, (rx_packet_diff + tx_packet_diff) / elapsed)
+                        self.metrics.bandwidth = self.metrics.download_speed + self.metrics.upload_speed
                 self.last_network_stats = {
                     'rx_bytes': rx_bytes,
                     'tx_bytes': tx_bytes,
@@ -132,20 +136,23 @@ class NetworkMonitor:
         base_speed = 1000000  # 1MB/s
         import random
         variation = random.uniform(0.75, 1.25)
-        self.metrics.download_speed = base_speed * variation
-        self.metrics.upload_speed = self.metrics.download_speed * random.uniform(0.1, 0.3)
-        self.metrics.latency = random.uniform(15, 40)
-        self.metrics.bandwidth = self.metrics.download_speed + self.metrics.upload_speed
-        self.metrics.packets_per_second = random.uniform(200, 500)
+        with self._metrics_lock:
+            self.metrics.download_speed = base_speed * variation
+            self.metrics.upload_speed = self.metrics.download_speed * random.uniform(0.1, 0.3)
+            self.metrics.latency = random.uniform(15, 40)
+            self.metrics.bandwidth = self.metrics.download_speed + self.metrics.upload_speed
+            self.metrics.packets_per_second = random.uniform(200, 500)
         self.metrics.connection_count = random.randint(10, 40)
         self.metrics.packet_loss = random.uniform(0, 1.5)
 
     def record_transfer(self, bytes_amount, packets=1):
-        self.metrics.download_speed += bytes_amount
-        self.metrics.packets_per_second += packets
+        with self._metrics_lock:
+            self.metrics.download_speed += bytes_amount
+            self.metrics.packets_per_second += packets
 
     def get_metrics(self):
-        return vars(self.metrics).copy()
+        with self._metrics_lock:
+            return vars(self.metrics).copy()
 
     def stop(self):
         self._running = False
